@@ -2,12 +2,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import re
 from datetime import datetime
-import plotly.io as pio
 import plotly.graph_objects as go
-import collections
-import itertools
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from charset_normalizer import from_bytes
 
 # Plotly 한글 폰트 설정 (Windows 기준: 맑은 고딕)
 def apply_kr_font(fig):
@@ -25,8 +24,7 @@ import os
 import glob
 
 # [데이터 로드 (캐싱 및 폴더 스캔)]
-@st.cache_data
-def load_data():
+def scan_data_files():
     # [배포 및 로컬 호환성 경로 설정]
     # 1. 상대 경로 시도 (Streamlit Cloud용)
     data_dir = "./data/"
@@ -38,70 +36,138 @@ def load_data():
         current_dir = os.path.dirname(os.path.abspath(__file__))
         data_dir = os.path.join(current_dir, "data")
         csv_files = glob.glob(os.path.join(data_dir, "*.csv"))
-    
-    if not csv_files:
-        return pd.DataFrame()
-    
-    df_list = []
-    for file in csv_files:
+
+    # 파일 경로/수정시각/크기를 캐시 키로 사용 (파일이 추가·변경되면 자동으로 다시 로드)
+    return tuple((f, os.path.getmtime(f), os.path.getsize(f)) for f in sorted(csv_files))
+
+# 파일 앞부분(64KB)으로 인코딩 판별 (데이터 추가 시 인코딩이 다를 수 있음)
+def detect_encoding(file):
+    sample_size = 64 * 1024
+    with open(file, 'rb') as f:
+        head = f.read(sample_size)
+    # 잘린 위치가 2바이트 한글(cp949) 중간이면 판별이 실패하므로 마지막 줄바꿈까지만 사용
+    if len(head) == sample_size:
+        head = head[:head.rfind(b'\n') + 1] or head
+    best = from_bytes(head).best()
+    if best is not None and best.encoding in ('cp949', 'euc_kr', 'johab', 'iso2022_kr'):
+        return 'cp949'
+    return 'utf-8'
+
+def read_csv_table(file):
+    # 판별한 인코딩으로 읽다가 디코딩 오류가 나면 다른 인코딩(cp949 <-> utf-8)으로 재시도
+    encoding = detect_encoding(file)
+    fallback = 'utf-8' if encoding == 'cp949' else 'cp949'
+    for i, enc in enumerate((encoding, fallback)):
         try:
-            # 여러 인코딩 시도 (데이터 추가 시 인코딩이 다를 수 있음)
-            temp_df = pd.read_csv(file, encoding='cp949')
-            temp_df['_source_file'] = os.path.basename(file)
-            df_list.append(temp_df)
-        except:
-            temp_df = pd.read_csv(file, encoding='utf-8')
-            temp_df['_source_file'] = os.path.basename(file)
-            df_list.append(temp_df)
-            
-    df = pd.concat(df_list, ignore_index=True)
-    
-    # 중복 주문 제거 (데이터가 중첩되어 추가될 경우 대비)
-    df = df.drop_duplicates(subset=['주문번호', '상품코드'], keep='last')
-    
-    # 날짜 컬럼 변환
-    date_cols = ['주문일', '입금일', '배송준비 처리일']
-    for col in date_cols:
-        df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-    # 데이터 클렌징: 결제금액 및 공급가 결측치 처리
-    df['결제금액(상품별)'] = df['결제금액(상품별)'].fillna(0)
-    df['공급가'] = df['공급가'].fillna(0)
-    df['주문취소 금액(상품별)'] = df['주문취소 금액(상품별)'].fillna(0)
+            return pacsv.read_csv(
+                file,
+                read_options=pacsv.ReadOptions(encoding=enc, block_size=8 << 20),
+                parse_options=pacsv.ParseOptions(delimiter=','),
+                convert_options=pacsv.ConvertOptions(strings_can_be_null=True),  # 빈 문자열은 pandas와 동일하게 결측치 처리
+            )
+        except (UnicodeDecodeError, pa.ArrowInvalid):
+            if i == 1:
+                raise
+
+# [캐시 보관 한도] 데이터 파일/필터 조합이 바뀔 때마다 캐시가 끝없이 쌓이지 않도록 제한
+DATA_CACHE_MAX_ENTRIES = 2      # data_key 단위 메모리 캐시 (현재 데이터 + 교체 직전 데이터)
+FILTER_CACHE_MAX_ENTRIES = 32   # filter_key 단위 집계 캐시 (최근 필터 조합)
+FILTER_CACHE_TTL = 3600         # filter_key 단위 집계 캐시 보관 시간 (초)
+filter_cache = st.cache_data(show_spinner=False, ttl=FILTER_CACHE_TTL, max_entries=FILTER_CACHE_MAX_ENTRIES)
+
+# CSV 파싱 결과는 디스크에 보존하여 프로세스 재시작 후에도 재사용 (현재 데이터 1건만 보관)
+@st.cache_data(persist="disk", show_spinner=False)
+def load_raw(data_key):
+    # 이 본문은 캐시 미스(새 data_key)일 때만 실행되므로, 이전 data_key의 파싱 결과(메모리/디스크)를 먼저 모두 정리
+    # (max_entries 제거는 메모리 캐시에만 적용되고 디스크 파일은 남기 때문에 직접 clear)
+    load_raw.clear()
+    # PyArrow 멀티스레드 CSV 파서로 파일당 한 번만 읽음
+    tables = []
+    for file, _, _ in data_key:
+        table = read_csv_table(file)
+        # 파일명은 사전(dictionary) 인코딩으로 추가 (행마다 문자열을 만들지 않고 pandas 변환 시 바로 카테고리형)
+        source = pa.DictionaryArray.from_arrays(np.zeros(table.num_rows, dtype=np.int32), [os.path.basename(file)])
+        table = table.append_column('_source_file', source)
+        tables.append(table)
+
+    # 파일마다 타입 추론이 달라 승격할 수 없는 컬럼(예: 하이픈이 들어간 연락처, 영문이 섞인 주문번호)은
+    # pandas concat의 object 폴백처럼 모든 파일에서 문자열로 통일 (정수/실수 혼합은 아래 승격으로 실수 처리)
+    field_types = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                field_types.setdefault(field.name, set()).add(field.type)
+    conflicted = [name for name, types in field_types.items()
+                  if len(types) > 1 and not all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types)]
+    for i, table in enumerate(tables):
+        for name in conflicted:
+            idx = table.schema.get_field_index(name)
+            if idx >= 0 and table.schema.field(idx).type != pa.string():
+                table = table.set_column(idx, name, table.column(idx).cast(pa.string()))
+        tables[i] = table
+
+    # 컬럼 구성이 다르거나(없는 컬럼은 결측) 정수/실수가 섞인 경우는 스키마 승격으로 통합 (청크만 이어 붙이므로 복사 없음)
+    table = pa.concat_tables(tables, promote_options="permissive")
+    del tables
+    # 컬럼별 블록으로 변환하면서 변환이 끝난 Arrow 버퍼를 즉시 해제 (최대 메모리 사용량 감소)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+# 날짜 문자열 변환: 명시적 포맷(dateutil 대신 C 파서)으로 먼저 변환하고,
+# 포맷이 달라(예: '2025/09/01 10:00', 초 단위 없음) 새로 결측이 생기면 자동 추론 변환으로 다시 처리
+def parse_datetime(col, date_format='%Y-%m-%d %H:%M:%S'):
+    parsed = pd.to_datetime(col, format=date_format, errors='coerce', cache=True)
+    if parsed.isna().sum() > col.isna().sum():
+        parsed = pd.to_datetime(col, errors='coerce', cache=True)
+    return parsed
+
+@st.cache_data(max_entries=DATA_CACHE_MAX_ENTRIES)
+def load_data(data_key):
+    if not data_key:
+        return pd.DataFrame()
+
+    df = load_raw(data_key)
+
+    # 중복 주문 제거 (데이터가 중첩되어 추가될 경우 대비) 후
+    # 날짜 변환 / 결측치 처리 / 기본 파생 변수를 하나의 assign 파이프라인으로 처리
+    df = df.drop_duplicates(subset=['주문번호', '상품코드'], keep='last').assign(**{
+        # 날짜 컬럼 변환
+        '주문일': lambda d: parse_datetime(d['주문일']),
+        '입금일': lambda d: parse_datetime(d['입금일']),
+        '배송준비 처리일': lambda d: parse_datetime(d['배송준비 처리일']),
+        # 데이터 클렌징: 결제금액 및 공급가 결측치 처리
+        '결제금액(상품별)': lambda d: d['결제금액(상품별)'].fillna(0),
+        '공급가': lambda d: d['공급가'].fillna(0),
+        '주문취소 금액(상품별)': lambda d: d['주문취소 금액(상품별)'].fillna(0),
+        # 파생 변수 생성
+        'GP': lambda d: d['결제금액(상품별)'] - d['공급가'],
+        '마진율': lambda d: np.where(d['결제금액(상품별)'] > 0, d['GP'] / d['결제금액(상품별)'], 0),
+    })
     
-    # 파생 변수 생성
-    df['GP'] = df['결제금액(상품별)'] - df['공급가']
-    df['마진율'] = np.where(df['결제금액(상품별)'] > 0, df['GP'] / df['결제금액(상품별)'], 0)
+    # 고객/주문일 순으로 한 번만 정렬 (이후 고객 단위 groupby는 재정렬 없이 sort=False로 처리)
+    # 인덱스는 원본 파일 내 행 순서로 유지 (고객별 '파일상 첫 행' 조회용, 아래 병합은 인덱스를 보존하는 join 사용)
+    if '주문자연락처' in df.columns:
+        df = df.sort_values(['주문자연락처', '주문일'], kind='stable')
     
-    # 상품명에서 중량 및 등급 추출
-    def extract_option(name, pattern):
-        match = re.search(pattern, str(name))
-        return match.group() if match else "기타"
-
-    df['중량'] = df['상품명'].apply(lambda x: extract_option(x, r'\d+\.?\d*kg'))
-    df['등급'] = df['상품명'].apply(lambda x: extract_option(x, r'(로얄과|소과|중대과|대과|특대과|가정용)'))
+    # 상품명에서 중량 및 등급 추출 (벡터화된 정규식)
+    names = df['상품명'].astype(str)
+    df['중량'] = names.str.extract(r'(\d+\.?\d*kg)', expand=False).fillna("기타")
+    df['등급'] = names.str.extract(r'(로얄과|소과|중대과|대과|특대과|가정용)', expand=False).fillna("기타")
     
-    # 주소에서 지역(시/도) 추출
-    def extract_region(address):
-        if pd.isna(address) or address == "": return "기타"
-        return str(address).split()[0]
+    # 주소에서 지역(시/도) 추출 (첫 어절)
+    df['지역'] = df['주소'].fillna("").astype(str).str.split(n=1).str[0].fillna("기타").replace("", "기타")
     
-    df['지역'] = df['주소'].apply(extract_region)
+    # [카테고리형 변환] 반복적으로 groupby/merge/필터 키로 쓰이는 문자열 컬럼
+    # 문자열 해싱 대신 정수 코드 기반으로 처리되며 메모리 사용량도 줄어듦
+    # (주문번호는 거의 모든 집계에서 nunique 대상이므로 코드화해 두면 매 집계의 문자열 해싱을 건너뜀)
+    for col in ['주문경로', '셀러명', '회원구분', '중량', '등급', '지역', '상품명', '상품코드', '_source_file', '주문자연락처', '주문번호']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
     
-    # 고객별 재구매 분석을 위한 파생 변수
-    if '주문자연락처' in df.columns:
-        customer_orders = df.groupby('주문자연락처')['주문번호'].nunique().reset_index()
-        customer_orders.columns = ['주문자연락처', '총주문횟수']
-        df = df.merge(customer_orders, on='주문자연락처', how='left')
-        df['고객유형'] = np.where(df['총주문횟수'] > 1, "재구매고객", "신규고객")
-        df['재구매여부'] = np.where(df['총주문횟수'] > 1, "재구매", "신규")
-    else:
-        df['고객유형'] = "분석불가"
-        df['재구매여부'] = "분석불가"
-        
     # [시간/요일 분석용 변수]
     df['주문요일'] = df['주문일'].dt.day_name()
     df['주문시'] = df['주문일'].dt.hour
+    # 날짜 필터용 (자정 기준 정규화, datetime64 유지)
+    df['주문일자'] = df['주문일'].dt.normalize()
     
     # 요일 순서 정렬을 위한 카테고리 설정
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -119,52 +185,6 @@ def load_data():
     df['총할인액'] = df['쿠폰 사용금액(통합)'] + df['포인트 사용금액(통합)']
     df['순매출'] = df['결제금액(상품별)'] # 실제 상품별 실결제액 기준 분석
     
-    # [RFM 분석용 데이터 미리 계산]
-    if '주문자연락처' in df.columns:
-        # 기준일 (데이터 상 마지막 날)
-        ref_date = df['주문일'].max()
-        rfm = df.groupby('주문자연락처').agg({
-            '주문일': lambda x: (ref_date - x.max()).days, # Recency
-            '주문번호': 'nunique',                         # Frequency
-            '결제금액(상품별)': 'sum'                       # Monetary
-        }).reset_index()
-        rfm.columns = ['주문자연락처', 'Recency', 'Frequency', 'Monetary']
-        
-        # RFM 스코어 산출 (1-5점 간이 방식)
-        rfm['R_score'] = pd.qcut(rfm['Recency'].rank(method='first'), 5, labels=[5, 4, 3, 2, 1]).astype(int)
-        rfm['F_score'] = pd.qcut(rfm['Frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int)
-        rfm['M_score'] = pd.qcut(rfm['Monetary'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5]).astype(int)
-        rfm['RFM_Total'] = rfm['R_score'] + rfm['F_score'] + rfm['M_score']
-        
-        # 고객 세그먼트 분류
-        def segment_customer(total):
-            if total >= 13: return 'VIP (최우수)'
-            elif total >= 10: return '우수 고객'
-            elif total >= 7: return '잠재 고객'
-            else: return '집중 관리'
-        rfm['고객세그먼트'] = rfm['RFM_Total'].apply(segment_customer)
-        
-        # 원본 df에 세그먼트 정보 병합
-        df = df.merge(rfm[['주문자연락처', '고객세그먼트']], on='주문자연락처', how='left')
-        
-    # [코호트 분석용 변수]
-    if '주문자연락처' in df.columns:
-        df['주문월'] = df['주문일'].dt.to_period('M')
-        df['첫구매월'] = df.groupby('주문자연락처')['주문일'].transform('min').dt.to_period('M')
-        
-        # 첫 구매월로부터 몇 달이 지났는지 계산
-        df['코호트_경과'] = (df['주문월'].view(dtype='int64') - df['첫구매월'].view(dtype='int64'))
-        
-    # [LTV 분석용 변수]
-    if '주문자연락처' in df.columns:
-        # 고객별 첫 구매일과 마지막 구매일 차이 (수명)
-        cust_life = df.groupby('주문자연락처').agg({
-            '주문일': [lambda x: (x.max() - x.min()).days, 'count'],
-            '결제금액(상품별)': 'sum'
-        }).reset_index()
-        cust_life.columns = ['주문자연락처', '수명일수', '총구매건수', '누적매출']
-        df = df.merge(cust_life[['주문자연락처', '수명일수', '총구매건수', '누적매출']], on='주문자연락처', how='left')
-    
     # [가격 민감도 분석용 변수]
     df['개별할인율'] = np.where(df['결제금액(상품별)'] > 0, df['총할인액'] / (df['결제금액(상품별)'] + df['총할인액']), 0)
     
@@ -175,47 +195,364 @@ def load_data():
     if '배송준비 처리일' in df.columns:
         df['배송리드타임'] = (df['배송준비 처리일'] - df['주문일']).dt.days
         
-    # [재구매 주기 분석용 변수]
+    # [고객 단위 파생 변수] 재구매 / RFM / 코호트 / LTV / 이탈 리스크 / 앵커 상품
+    # 고객별 지표는 한 번의 groupby로 집계하고, 원본 df에는 마지막에 한 번만 병합
     if '주문자연락처' in df.columns:
-        repeat_custs = df.sort_values(['주문자연락처', '주문일']).groupby('주문자연락처')
-        df['이전구매일'] = repeat_custs['주문일'].shift(1)
+        # [재구매 주기 분석용 변수] (이미 고객/주문일 순으로 정렬된 상태)
+        df['이전구매일'] = df.groupby('주문자연락처', sort=False, observed=True)['주문일'].shift(1)
         df['구매간격'] = (df['주문일'] - df['이전구매일']).dt.days
         
-    # [이탈 리스크 분석용 변수]
-    if '주문자연락처' in df.columns:
-        last_purchase = df.groupby('주문자연락처')['주문일'].max().reset_index()
+        cust = df.groupby('주문자연락처', sort=False, observed=True).agg(
+            총주문횟수=('주문번호', 'nunique'),
+            첫구매일=('주문일', 'min'),
+            최근구매일=('주문일', 'max'),
+            총구매건수=('주문일', 'count'),
+            누적매출=('결제금액(상품별)', 'sum'),
+        )
+        
+        # 기준일 (데이터 상 마지막 날)로부터 미구매 기간 (= Recency)
         ref_date = df['주문일'].max()
-        last_purchase['미구매기간'] = (ref_date - last_purchase['주문일']).dt.days
+        cust['미구매기간'] = (ref_date - cust['최근구매일']).dt.days
+        
+        # [RFM 분석용 데이터] R: 미구매기간(역순) / F: 총주문횟수 / M: 누적매출
+        # RFM 스코어 산출 (1-5점 간이 방식)
+        # 순위(동점은 등장 순서)의 5분위 경계를 구한 뒤 np.searchsorted로 구간 번호를 매김 (qcut과 동일 결과)
+        rfm_total = np.zeros(len(cust), dtype=np.int64)
+        for col, invert in [('미구매기간', True), ('총주문횟수', False), ('누적매출', False)]:
+            arr = cust[col].to_numpy()
+            ranks = np.empty(len(arr))
+            ranks[np.argsort(arr, kind='stable')] = np.arange(1, len(arr) + 1)
+            edges = np.quantile(ranks, [0.2, 0.4, 0.6, 0.8])
+            score = np.searchsorted(edges, ranks, side='left') + 1
+            rfm_total += (6 - score) if invert else score
+        
+        # 고객 세그먼트 분류 (~6: 집중 관리 / 7~9: 잠재 / 10~12: 우수 / 13~: VIP)
+        # 경계값보다 큰 개수가 곧 구간 번호이므로 int8 코드로 바로 카테고리 생성
+        cust['고객세그먼트'] = pd.Categorical.from_codes(
+            np.searchsorted([6, 9, 12], rfm_total, side='left').astype(np.int8),
+            categories=['집중 관리', '잠재 고객', '우수 고객', 'VIP (최우수)'],
+            ordered=True
+        )
         
+        # [코호트 분석용 변수]
+        cust['첫구매월'] = cust['첫구매일'].dt.to_period('M')
+        
+        # [LTV 분석용 변수] 고객별 첫 구매일과 마지막 구매일 차이 (수명)
+        cust['수명일수'] = (cust['최근구매일'] - cust['첫구매일']).dt.days
+        
+        # [이탈 리스크 분석용 변수]
         # 전체 평균 재구매 주기의 2배가 넘으면 '이탈 위험'으로 간주
         avg_cycle = df[df['구매간격'] > 0]['구매간격'].mean() if len(df[df['구매간격']>0]) > 0 else 30
-        def classify_churn(days):
-            if days > avg_cycle * 3: return '완전 이탈'
-            elif days > avg_cycle * 2: return '이탈 위험'
-            elif days > avg_cycle: return '주의 요망'
-            else: return '활동 고객'
+        days = cust['미구매기간'].to_numpy()
+        cust['이탈위험도'] = pd.Categorical.from_codes(
+            np.searchsorted([avg_cycle, avg_cycle * 2, avg_cycle * 3], days, side='left').astype(np.int8),
+            categories=['활동 고객', '주의 요망', '이탈 위험', '완전 이탈']
+        )
         
-        last_purchase['이탈위험도'] = last_purchase['미구매기간'].apply(classify_churn)
-        df = df.merge(last_purchase[['주문자연락처', '이탈위험도', '미구매기간']], on='주문자연락처', how='left')
+        # [앵커 상품 분석용 변수] 최초 구매 상품 식별 (정렬된 데이터의 고객별 첫 행)
+        first_orders = df.drop_duplicates('주문자연락처').set_index('주문자연락처')
+        cust['최초주문번호'] = first_orders['주문번호']
+        cust['최초구매상품'] = first_orders['상품명']
         
-    # [앵커 상품 분석용 변수] 최초 구매 상품 식별
-    if '주문자연락처' in df.columns:
-        first_orders = df.sort_values(['주문자연락처', '주문일']).groupby('주문자연락처').head(1)
-        df = df.merge(first_orders[['주문자연락처', '주문번호', '상품명']].rename(columns={'상품명': '최초구매상품', '주문번호': '최초주문번호'}), on='주문자연락처', how='left')
+        # 원본 df에 고객 단위 지표 병합
+        df = df.join(cust.drop(columns=['최근구매일']), on='주문자연락처')
+        df['고객유형'] = np.where(df['총주문횟수'] > 1, "재구매고객", "신규고객")
+        df['재구매여부'] = np.where(df['총주문횟수'] > 1, "재구매", "신규")
+        
+        # 첫 구매월로부터 몇 달이 지났는지 계산 (월 단위 정수 차이)
+        order_m = df['주문일'].to_numpy().astype('datetime64[M]').astype('int64')
+        first_m = df.pop('첫구매일').to_numpy().astype('datetime64[M]').astype('int64')
+        df['코호트_경과'] = order_m - first_m
+    else:
+        df['고객유형'] = "분석불가"
+        df['재구매여부'] = "분석불가"
         
     # [재고 효율 분석용 변수] 판매량 대비 주문 빈도 (회전율 대용)
-    prod_stats = df.groupby('상품명').agg({'주문수량': 'sum', '주문번호': 'nunique'}).reset_index()
+    prod_stats = df.groupby('상품명', sort=False, observed=True).agg({'주문수량': 'sum', '주문번호': 'nunique'})
     prod_stats['회전율지표'] = prod_stats['주문수량'] / prod_stats['주문번호'].replace(0, 1)
-    df = df.merge(prod_stats[['상품명', '회전율지표']], on='상품명', how='left')
+    df = df.join(prod_stats['회전율지표'], on='상품명')
     
     # [가격대별 분석용 변수] 1만원 단위 그룹화
     df['단가'] = np.where(df['주문수량'] > 0, df['순매출'] / df['주문수량'], 0)
-    df['가격대'] = (df['단가'] // 10000 * 10000).astype(int).apply(lambda x: f"{x:,.0f}원대")
+    # 금액 순서대로 정렬된 순서형 카테고리로 만들어 두면 집계 결과가 바로 가격 순으로 나옴 (문자열 파싱 정렬 불필요)
+    price_floor = (df['단가'] // 10000 * 10000).astype(int).to_numpy()
+    price_bands = np.unique(price_floor)
+    df['가격대'] = pd.Categorical.from_codes(
+        np.searchsorted(price_bands, price_floor),
+        categories=[f"{x:,.0f}원대" for x in price_bands],
+        ordered=True
+    )
+    
+    # [수치형 다운캐스트] 비율/지표 컬럼은 float32, 건수/일수 컬럼은 int32로 축소
+    for col in ['마진율', '개별할인율', '회전율지표', '단가', '배송리드타임', '구매간격']:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    # (연락처가 비어 고객 단위 지표가 병합되지 않은 행 등 결측이 있으면 정수 변환이 불가하므로 그대로 둠)
+    for col in ['주문수량', '총주문횟수', '총구매건수', '수명일수', '미구매기간', '코호트_경과']:
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype('int32')
+    # 원 단위 금액 컬럼은 합계가 정확해야 하므로 float32 대신 int32로 축소 (sum/cumsum/groupby 합계는 int64로 누적됨)
+    # 값 범위가 int32를 넘는 데이터는 int64 유지
+    int32_info = np.iinfo(np.int32)
+    for col in ['결제금액(상품별)', '결제금액(통합)', '공급가', 'GP', '순매출', '총할인액', '누적매출',
+                '주문취소 금액(상품별)', '부분취소금액(통합)', '포인트 사용금액(통합)', '쿠폰 사용금액(통합)']:
+        if col in df.columns and df[col].dtype == 'int64' and int32_info.min <= df[col].min() and df[col].max() <= int32_info.max:
+            df[col] = df[col].astype('int32')
+    
+    # [카테고리형 변환] 탭 집계의 groupby 키로 쓰이는 파생 구분 컬럼
+    for col in ['주말여부', '고객유형', '재구매여부']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
     
     return df
 
+# [필터 기준 집계 (캐싱)]
+# filter_key(데이터 키 + 필터 선택값)가 같으면 재실행 시 집계를 건너뜀
+# 밑줄로 시작하는 _df 인자는 Streamlit 해시 대상에서 제외됨 (대용량 DataFrame 해싱 비용 방지)
+# 필터 조합마다 항목이 늘어나므로 최근 FILTER_CACHE_MAX_ENTRIES개, FILTER_CACHE_TTL초까지만 보관
+@filter_cache
+def compute_prod_agg(filter_key, _df):
+    # 경영 요약/상품 TOP/트랜드/ABC/키워드/집중도 탭이 함께 사용하는 상품 단위 집계
+    prod_agg = _df.groupby(['상품코드', '상품명'], observed=True).agg({
+        '주문번호': 'nunique',
+        '주문수량': 'sum',
+        '결제금액(상품별)': 'sum',
+        '공급가': 'sum',
+        'GP': 'sum'
+    }).reset_index()
+    prod_agg['마진율'] = np.where(prod_agg['결제금액(상품별)'] > 0, prod_agg['GP'] / prod_agg['결제금액(상품별)'], 0)
+    return prod_agg
+
+@filter_cache
+def compute_seller_agg(filter_key, _df):
+    seller_agg = _df.groupby('셀러명', observed=True).agg({
+        '주문번호': 'nunique',
+        '결제금액(상품별)': 'sum',
+        'GP': 'sum'
+    }).reset_index()
+    seller_agg.columns = ['셀러명', '주문건수', '매출', '이익(GP)']
+    return seller_agg.sort_values('매출', ascending=False)
+
+@filter_cache
+def compute_channel_agg(filter_key, _df):
+    channel_agg = _df.groupby('주문경로', observed=True).agg({
+        '주문번호': 'nunique',
+        '결제금액(상품별)': 'sum',
+        'GP': 'sum',
+        '주문수량': 'sum'
+    }).reset_index()
+    channel_agg.columns = ['채널', '주문건수', '매출', 'GP', '주문수량']
+    channel_agg['AOV'] = channel_agg['매출'] / channel_agg['주문건수']
+    return channel_agg
+
+@filter_cache
+def compute_region_agg(filter_key, _df):
+    region_agg = _df.groupby('지역', observed=True).agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
+    region_agg.columns = ['지역', '매출', '주문건수']
+    return region_agg
+
+@filter_cache
+def compute_weight_agg(filter_key, _df):
+    return _df.groupby('중량', observed=True).agg({'주문수량': 'sum', '결제금액(상품별)': 'sum'}).reset_index()
+
+@filter_cache
+def compute_grade_agg(filter_key, _df):
+    return _df.groupby('등급', observed=True).agg({'주문수량': 'sum', '결제금액(상품별)': 'sum'}).reset_index()
+
+@filter_cache
+def compute_kpis(filter_key, _df):
+    # 필터 기준 전체 합계 지표 - KPI 카드/경영 요약 탭이 공유하고, 슬라이더/입력값을 바꿔도 재집계 없이 이 값들로만 계산
+    return {
+        'total_sales': _df['결제금액(상품별)'].sum(),
+        'total_gp': _df['GP'].sum(),
+        'total_supply': _df['공급가'].sum(),
+        'total_qty': _df['주문수량'].sum(),
+        'total_cancel': _df['주문취소 금액(상품별)'].sum(),
+        'order_count': _df['주문번호'].nunique(),
+        'order_days': _df['주문일'].nunique(),
+        'customer_count': _df['주문자연락처'].nunique() if '주문자연락처' in _df.columns else 0,
+    }
+
+@filter_cache
+def compute_summary_scalars(filter_key, _df):
+    region_agg = compute_region_agg(filter_key, _df)
+    seller_agg = compute_seller_agg(filter_key, _df)
+    prod_agg = compute_prod_agg(filter_key, _df)
+    total_sales = compute_kpis(filter_key, _df)['total_sales']
+    return {
+        'top_region': region_agg.loc[region_agg['매출'].idxmax(), '지역'] if not region_agg.empty else "N/A",
+        'top_seller': seller_agg.iloc[0]['셀러명'] if not seller_agg.empty else "N/A",
+        'low_margin_count': int((prod_agg['마진율'] < 0.1).sum()),
+        'repeat_customer_rate': ((_df['고객유형'] == '재구매고객').sum() / len(_df) * 100) if len(_df) > 0 else 0,
+        # 요일/시간 피크 타임 분석
+        'top_day': _df['주문요일'].mode()[0] if not _df['주문요일'].empty else "N/A",
+        'top_hour': _df['주문시'].mode()[0] if not _df['주문시'].empty else "N/A",
+        # 할인 효율 분석 (주문건별 평균 할인율)
+        'avg_discount_rate': (_df['총할인액'].sum() / total_sales * 100) if total_sales > 0 else 0,
+    }
+
+@filter_cache
+def compute_cohort_retention(filter_key, _df):
+    cohort_counts = _df.groupby(['첫구매월', '코호트_경과'])['주문자연락처'].nunique().reset_index()
+    cohort_pivot = cohort_counts.pivot(index='첫구매월', columns='코호트_경과', values='주문자연락처')
+    cohort_size = cohort_pivot.iloc[:, 0]
+    retention = cohort_pivot.divide(cohort_size, axis=0)
+    retention.index = retention.index.astype(str)
+    return retention
+
+# [탭별 집계 (캐싱)] 탭 본문에서는 집계 결과만 받아 차트/표를 그림 (위젯 값과 무관한 집계만 캐싱)
+@filter_cache
+def compute_prod_stats(filter_key, _df):
+    # 상품명 단위 공용 집계 (성장 매트릭스/재고 효율/수익성 매트릭스/상위 상품 선정이 한 번의 groupby를 공유)
+    return _df.groupby('상품명', observed=True).agg({
+        '결제금액(상품별)': 'sum',
+        '주문수량': 'sum',
+        'GP': 'sum',
+        '마진율': 'mean',
+        '주문번호': 'nunique'
+    })
+
+@filter_cache
+def compute_cust_df(filter_key, _df):
+    # 고객 단위 공용 테이블 (고객 단위 파생 지표 + 필터 기간 매출/구매간격) - 고객/CRM 탭이 한 번의 groupby를 공유
+    grouped = _df.groupby('주문자연락처', observed=True, sort=False)
+    cust_df = grouped[['누적매출', '총구매건수', '최초구매상품', '재구매여부', '고객세그먼트', '이탈위험도']].first(skipna=False)
+    # 고객 순서와 구매간격(행마다 다름)은 원본 파일 순서상 고객별 첫 행 기준 (인덱스 = 파일 내 행 순서)
+    first_rows = (_df[['주문자연락처', '구매간격']].sort_index(kind='stable')
+                  .drop_duplicates('주문자연락처').dropna(subset=['주문자연락처']).set_index('주문자연락처'))
+    cust_df = cust_df.reindex(first_rows.index)
+    cust_df['구매간격'] = first_rows['구매간격']
+    cust_df['결제금액(상품별)'] = grouped['결제금액(상품별)'].sum()
+    return cust_df.reset_index()
+
+@filter_cache
+def compute_prod_sales(filter_key, _df):
+    # 상품별 매출 (내림차순) - 상위 N개 상품 선정용
+    return compute_prod_stats(filter_key, _df)['결제금액(상품별)'].sort_values(ascending=False)
+
+@filter_cache
+def compute_region_prod_agg(filter_key, _df):
+    return _df.groupby(['지역', '상품명'], observed=True).agg({'결제금액(상품별)': 'sum'}).reset_index()
+
+@filter_cache
+def compute_weekend_agg(filter_key, _df):
+    weekend_agg = _df.groupby('주말여부', observed=True).agg({
+        '결제금액(상품별)': 'sum',
+        '주문번호': 'nunique',
+        '주문수량': 'sum'
+    }).reset_index()
+    weekend_agg['객단가'] = np.where(weekend_agg['주문번호'] > 0, weekend_agg['결제금액(상품별)'] / weekend_agg['주문번호'], 0)
+    return weekend_agg
+
+@filter_cache
+def compute_prod_growth(filter_key, _df):
+    prod_growth = compute_prod_stats(filter_key, _df)[['결제금액(상품별)', '주문수량']].reset_index()
+    # 평균 매출/평균 수량 기준 4분면 분류
+    rev_hi = prod_growth['결제금액(상품별)'].to_numpy() >= prod_growth['결제금액(상품별)'].mean()
+    qty_hi = prod_growth['주문수량'].to_numpy() >= prod_growth['주문수량'].mean()
+    prod_growth['성장단계'] = np.select(
+        [rev_hi & qty_hi, rev_hi & ~qty_hi, ~rev_hi & qty_hi],
+        ['Star (주력성장)', 'Cash Cow (수익효자)', 'Wild Card (박리다매)'],
+        default='Dog (관리대상)'
+    )
+    return prod_growth
+
+@filter_cache
+def compute_product_mix(filter_key, _df, _new_prods):
+    prod_type = pd.Series(np.where(_df['상품명'].isin(_new_prods), "신규상품", "기존상품"), index=_df.index, name='상품구분')
+    return _df.groupby(prod_type)['결제금액(상품별)'].sum().reset_index()
+
+@filter_cache
+def compute_price_band_agg(filter_key, _df):
+    # 가격대는 금액 순 순서형 카테고리이므로 groupby 결과가 이미 가격 순으로 정렬됨
+    return _df.groupby('가격대', observed=True).agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
+
+@filter_cache
+def compute_inventory_agg(filter_key, _df):
+    # 회전율 지표가 높을수록 한번 주문 시 대량 판매, 낮을수록 소량/빈번 판매
+    inv_agg = compute_prod_stats(filter_key, _df)[['주문수량', '주문번호', '결제금액(상품별)']].reset_index()
+    inv_agg['회전력'] = inv_agg['주문수량'] / inv_agg['주문번호']
+    return inv_agg
+
+@filter_cache
+def compute_daily_prod_sales(filter_key, _df):
+    # 상위 10개 상품의 일자별 매출 (상관관계 분석용)
+    top_prods_list = compute_prod_sales(filter_key, _df).head(10).index.tolist()
+    return _df[_df['상품명'].isin(top_prods_list)].groupby(['주문일', '상품명'], observed=True)['결제금액(상품별)'].sum().unstack().fillna(0)
+
+@filter_cache
+def compute_channel_hour_pivot(filter_key, _df):
+    return _df.groupby(['주문시', '주문경로'], observed=True)['결제금액(상품별)'].sum().unstack(fill_value=0)
+
+def rolling_mean(values, window):
+    # 짧은 창의 이동평균은 np.convolve로 계산 (창 크기 미만 구간은 NaN, pandas rolling(window).mean()과 동일)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.convolve(values, np.ones(window) / window, mode='valid')
+    return out
+
+@filter_cache
+def compute_daily_sales(filter_key, _df):
+    # 일자별 매출 - 추세(7일)와 이동평균(5/20일) 탭이 같은 집계를 공유
+    return _df.groupby('주문일')['결제금액(상품별)'].sum()
+
+@filter_cache
+def compute_daily_trend(filter_key, _df):
+    daily_sales = compute_daily_sales(filter_key, _df).reset_index()
+    sales_arr = daily_sales['결제금액(상품별)'].to_numpy()
+    trend = rolling_mean(sales_arr, 7)
+    daily_sales['Trend(7D)'] = trend
+    daily_sales['Vitality(순성장)'] = sales_arr - trend
+    return daily_sales
+
+@filter_cache
+def compute_ma_signals(filter_key, _df):
+    ma_df = compute_daily_sales(filter_key, _df).reset_index()
+    sales_arr = ma_df['결제금액(상품별)'].to_numpy()
+    ma5 = rolling_mean(sales_arr, 5)
+    ma20 = rolling_mean(sales_arr, 20)
+    signal = np.zeros(len(ma_df), dtype=np.int8)
+    signal[5:] = ma5[5:] > ma20[5:]
+    ma_df['MA5'] = ma5
+    ma_df['MA20'] = ma20
+    ma_df['Signal'] = signal
+    ma_df['Position'] = np.diff(signal, prepend=np.int8(0))
+    return ma_df
+
+@filter_cache
+def compute_basket_pairs(filter_key, _df):
+    # 주문번호 기준 자기 조인으로 같은 주문 내 상품쌍 생성 (카테고리 코드 비교로 중복쌍 제거)
+    # 주문번호/상품 순으로 정렬해 두면 동률 건수의 순서가 최초 등장 순서로 유지됨
+    basket = _df.loc[_df['상품명'].notna(), ['주문번호', '상품명']].drop_duplicates()
+    basket = basket.assign(상품코드값=basket['상품명'].cat.codes).sort_values(['주문번호', '상품코드값'], kind='stable')
+    pairs = basket.merge(basket, on='주문번호')
+    pairs = pairs[pairs['상품코드값_x'] < pairs['상품코드값_y']]
+    return pairs.groupby(['상품명_x', '상품명_y'], observed=True, sort=False).size()
+
+@filter_cache
+def compute_elasticity_fig(filter_key, _df):
+    # 상품별 OLS 추세선(statsmodels 적합)이 들어간 차트는 그리기 비용이 커서 Figure 자체를 dict로 캐싱
+    top_items = compute_prod_sales(filter_key, _df).head(5).index.tolist()
+    elasticity_df = _df[_df['상품명'].isin(top_items)].groupby(['상품명', '단가'], observed=True)['주문수량'].sum().reset_index()
+    fig_elas = apply_kr_font(px.scatter(elasticity_df, x='단가', y='주문수량', color='상품명', trendline="ols",
+                                       title="가격(X) 변화에 따른 판매량(Y) 민감도 (기울기가 급할수록 가격 저항이 큼)"))
+    return fig_elas.to_dict()
+
+# [원본 데이터 기준 집계 (캐싱)] 필터와 무관하므로 data_key만으로 재사용
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_MAX_ENTRIES)
+def compute_top_sellers(data_key, _df_raw):
+    return _df_raw.groupby('셀러명', observed=True)['결제금액(상품별)'].sum().nlargest(5).index.tolist()
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_MAX_ENTRIES)
+def compute_new_products(data_key, _df_raw):
+    # 첫 구매일 기준으로 신규 상품(최근 3개월 내 첫 등장) 구분
+    prod_first_seen = _df_raw.groupby('상품명', observed=True)['주문일'].min()
+    cutoff_date = _df_raw['주문일'].max() - pd.Timedelta(days=90)
+    return set(prod_first_seen.index[prod_first_seen > cutoff_date])
+
 try:
-    df_raw = load_data()
+    data_key = scan_data_files()
+    df_raw = load_data(data_key)
     if df_raw.empty:
         st.warning("데이터 폴더에 분석 가능한 CSV 파일이 없습니다. data 폴더를 확인해주세요.")
         st.stop()
@@ -236,116 +573,91 @@ date_range_min = df_raw['주문일'].min().date()
 date_range_max = df_raw['주문일'].max().date()
 date_range = st.sidebar.date_input("주문일 범위", [date_range_min, date_range_max])
 
-# 체크박스 필터 헬퍼 함수 (UX 개선)
-def checkbox_filter(label, options, key_prefix):
-    with st.sidebar.expander(f"{label} 선택", expanded=False):
-        all_key = f"{key_prefix}_all"
-        # '전체 선택' 체크박스
-        all_checked = st.checkbox(f"{label} 전체 선택", value=True, key=all_key)
-        
-        selected = []
-        for opt in options:
-            cb_key = f"{key_prefix}_{opt}"
-            # 전체 선택이 체크되어 있으면 개별 항목도 체크된 상태로 간주 (단, 사용자 조작은 가능하게 함)
-            if all_checked:
-                st.checkbox(opt, value=True, key=cb_key, disabled=True)
-                selected.append(opt)
-            else:
-                if st.checkbox(opt, value=False, key=cb_key):
-                    selected.append(opt)
-        
-        # 만약 아무것도 선택되지 않았다면 전체 옵션을 반환 (필터링 오류 방지)
-        if not selected:
-            return options
-        return selected
+# 다중 선택 필터 헬퍼 함수 (옵션 수와 무관하게 위젯 1개로 처리)
+def multiselect_filter(label, options, key_prefix):
+    selected = st.sidebar.multiselect(f"{label} 선택", options, default=options, key=key_prefix)
+    # 만약 아무것도 선택되지 않았다면 전체 옵션을 반환 (필터링 오류 방지)
+    return selected or options
+
+# 카테고리형 컬럼 isin 헬퍼 (선택값을 정수 코드로 바꿔 코드 배열에서 바로 조회)
+# keep_na=True면 전체가 선택된 경우 결측(코드 -1) 행도 유지 (결측은 선택지에 없으므로 '전체 선택'일 때만 포함)
+def cat_isin(col, selected, keep_na=False):
+    cats = col.cat.categories
+    codes_wanted = np.fromiter((cats.get_loc(s) for s in selected if s in cats), dtype=np.int32)
+    if keep_na and len(np.unique(codes_wanted)) == len(cats):
+        codes_wanted = np.append(codes_wanted, np.int32(-1))
+    return np.isin(col.cat.codes.to_numpy(), codes_wanted, kind='table')
 
 # 필터 옵션 추출
-all_channels = sorted(df_raw['주문경로'].unique().tolist())
-all_weights = sorted(df_raw['중량'].unique().tolist())
-all_grades = sorted(df_raw['등급'].unique().tolist())
-all_sellers = sorted(df_raw['셀러명'].dropna().unique().tolist())
-all_member_types = sorted(df_raw['회원구분'].dropna().unique().tolist())
-
-# 사이드바 체크박스 UI
-channels = checkbox_filter("주문경로", all_channels, "ch")
+# (카테고리형 컬럼의 categories는 결측치를 제외한 정렬된 고유값)
+all_channels = df_raw['주문경로'].cat.categories.tolist()
+all_weights = df_raw['중량'].cat.categories.tolist()
+all_grades = df_raw['등급'].cat.categories.tolist()
+all_sellers = df_raw['셀러명'].cat.categories.tolist()
+all_member_types = df_raw['회원구분'].cat.categories.tolist()
+
+# 사이드바 필터 UI
+channels = multiselect_filter("주문경로", all_channels, "ch")
 st.caption("ℹ️ **참고**: '기타' 경로는 네이버 검색/쇼핑이 아닌 외부 링크(SNS, 블로그)나 즐겨찾기 등을 통한 직접 방문을 포함합니다.")
-weights = checkbox_filter("중량", all_weights, "wt")
-grades = checkbox_filter("등급", all_grades, "gr")
-member_types = checkbox_filter("회원구분", all_member_types, "mb")
+weights = multiselect_filter("중량", all_weights, "wt")
+grades = multiselect_filter("등급", all_grades, "gr")
+member_types = multiselect_filter("회원구분", all_member_types, "mb")
 
-# [셀러 필터 고도화] 상위 5개는 선택, 나머지는 그룹으로 선택
+# [셀러 필터 고도화] 상위 5개와 나머지 셀러를 나누어 선택
 with st.sidebar.expander("👤 셀러 선택 (상위 5인 + 그 외)", expanded=False):
     # 매출 상위 5개 셀러 추출
-    seller_sales = df_raw.groupby('셀러명')['결제금액(상품별)'].sum().sort_values(ascending=False)
-    top_5_sellers = seller_sales.head(5).index.tolist()
+    top_5_sellers = compute_top_sellers(data_key, df_raw)
     other_sellers = [s for s in all_sellers if s not in top_5_sellers]
     
-    selected_sellers = []
+    # 1. 상위 5개 셀러 개별 선택
+    selected_sellers = st.multiselect("🏆 매출 Top 5 셀러", top_5_sellers, default=top_5_sellers, key="sl_top",
+                                      format_func=lambda s: f"{s} (Top {top_5_sellers.index(s)+1})")
     
-    # 1. 상위 5개 셀러 개별 체크박스
-    st.caption("🏆 매출 Top 5 셀러")
-    for s in top_5_sellers:
-        if st.checkbox(f"{s} (Top {top_5_sellers.index(s)+1})", value=True, key=f"sl_top_{s}"):
-            selected_sellers.append(s)
-            
-    # 2. 나머지 셀러 그룹 체크박스
+    # 2. 나머지 셀러 선택
     if other_sellers:
-        st.caption("📦 그 외 셀러 그룹")
-        if st.checkbox(f"나머지 전체 ({len(other_sellers)}명)", value=True, key="sl_others"):
-            selected_sellers.extend(other_sellers)
-            
+        selected_sellers = selected_sellers + st.multiselect(f"📦 그 외 셀러 ({len(other_sellers)}명)", other_sellers, default=other_sellers, key="sl_others")
+    
     # 최종 필터링 대상 셀러
     sellers = selected_sellers
 
+# 필터 선택값을 캐시 키로 묶음 (선택이 바뀌지 않으면 하위 집계를 재사용)
+filter_key = (data_key, tuple(date_range), tuple(channels), tuple(weights), tuple(grades), tuple(sellers), tuple(member_types))
+
 # 필터 적용
-mask = (
-    (df_raw['주문일'].dt.date >= date_range[0]) & 
-    (df_raw['주문일'].dt.date <= date_range[1]) &
-    (df_raw['주문경로'].isin(channels)) &
-    (df_raw['중량'].isin(weights)) &
-    (df_raw['등급'].isin(grades)) &
-    (df_raw['셀러명'].isin(sellers)) &
-    (df_raw['회원구분'].isin(member_types))
-)
-df = df_raw[mask].copy()
+d0, d1 = np.datetime64(date_range[0]), np.datetime64(date_range[1])
+mask = np.logical_and.reduce([
+    df_raw['주문일자'].between(d0, d1).to_numpy(),
+    cat_isin(df_raw['주문경로'], channels, keep_na=True),
+    cat_isin(df_raw['중량'], weights),
+    cat_isin(df_raw['등급'], grades),
+    cat_isin(df_raw['셀러명'], sellers),
+    cat_isin(df_raw['회원구분'], member_types),
+])
+# 위치 인덱스로 한 번에 추출 (take는 원본과 분리된 새 프레임을 반환)
+df = df_raw.take(np.flatnonzero(mask))
 
 # [데이터 집계] - 경영 요약 및 KPI 생성을 위한 기초 집계
 # 상품별 집계
-prod_agg = df.groupby('상품명').agg({
-    '결제금액(상품별)': 'sum', 
-    '주문수량': 'sum', 
-    'GP': 'sum',
-    '순매출': 'sum'
-}).reset_index()
-prod_agg['마진율'] = np.where(prod_agg['순매출'] > 0, prod_agg['GP'] / prod_agg['순매출'], 0)
-
-# 셀러별 집계
-seller_agg = df.groupby('셀러명').agg({
-    '결제금액(상품별)': 'sum',
-    'GP': 'sum'
-}).reset_index().sort_values('결제금액(상품별)', ascending=False)
-
-# 옵션(중량)별 집계
-weight_agg = df.groupby('중량').agg({
-    '결제금액(상품별)': 'sum',
-    '주문수량': 'sum'
-}).reset_index()
+prod_agg = compute_prod_agg(filter_key, df)
+
+# 셀러별 집계 (매출 내림차순)
+seller_agg = compute_seller_agg(filter_key, df)
+
+# 지역별 집계
+region_agg = compute_region_agg(filter_key, df)
 
 # 메인 타이틀
 st.title("🚀 CEO 매출 향상 전략 대시보드")
 
 # [Executive Summary] 시니어 마케터 브리핑 (데이터 연동)
-top_region = df.groupby('지역')['결제금액(상품별)'].sum().idxmax() if not df.empty else "N/A"
-top_seller = seller_agg.iloc[0]['셀러명'] if not seller_agg.empty else "N/A"
-low_margin_count = len(prod_agg[prod_agg['마진율'] < 0.1])
-repeat_customer_rate = (len(df[df['고객유형'] == '재구매고객']) / len(df) * 100) if len(df) > 0 else 0
-
-# 요일/시간 피크 타임 분석
-top_day = df['주문요일'].mode()[0] if not df['주문요일'].empty else "N/A"
-top_hour = df['주문시'].mode()[0] if not df['주문시'].empty else "N/A"
-
-# 할인 효율 분석 (주문건별 평균 할인율)
-avg_discount_rate = (df['총할인액'].sum() / df['결제금액(상품별)'].sum() * 100) if df['결제금액(상품별)'].sum() > 0 else 0
+summary = compute_summary_scalars(filter_key, df)
+top_region = summary['top_region']
+top_seller = summary['top_seller']
+low_margin_count = summary['low_margin_count']
+repeat_customer_rate = summary['repeat_customer_rate']
+top_day = summary['top_day']
+top_hour = summary['top_hour']
+avg_discount_rate = summary['avg_discount_rate']
 
 with st.container():
     st.markdown(f"""
@@ -373,14 +685,15 @@ st.subheader("📍 CEO 핵심 KPI")
 kpi1, kpi2, kpi3, kpi4 = st.columns(4)
 kpi5, kpi6, kpi7, kpi8 = st.columns(4)
 
-total_orders = df['주문번호'].nunique()
-total_qty = df['주문수량'].sum()
-total_sales = df['결제금액(상품별)'].sum()
-total_supply = df['공급가'].sum()
-total_gp = df['GP'].sum()
+kpis = compute_kpis(filter_key, df)
+total_orders = kpis['order_count']
+total_qty = kpis['total_qty']
+total_sales = kpis['total_sales']
+total_supply = kpis['total_supply']
+total_gp = kpis['total_gp']
 aov = total_sales / total_orders if total_orders > 0 else 0
 upo = total_qty / total_orders if total_orders > 0 else 0
-total_cancel = df['주문취소 금액(상품별)'].sum()
+total_cancel = kpis['total_cancel']
 cancel_rate = (total_cancel / total_sales * 100) if total_sales > 0 else 0
 
 with kpi1:
@@ -414,14 +727,7 @@ st.markdown("---")
 col_b1, col_b2 = st.columns([2, 1])
 with col_b1:
     st.subheader("📺 채널별 성과 분석")
-    channel_agg = df.groupby('주문경로').agg({
-        '주문번호': 'nunique',
-        '결제금액(상품별)': 'sum',
-        'GP': 'sum',
-        '주문수량': 'sum'
-    }).reset_index()
-    channel_agg.columns = ['채널', '주문건수', '매출', 'GP', '주문수량']
-    channel_agg['AOV'] = channel_agg['매출'] / channel_agg['주문건수']
+    channel_agg = compute_channel_agg(filter_key, df)
     
     fig_channel = apply_kr_font(px.bar(channel_agg, x='채널', y='매출', text_auto='.2s', color='GP', title="채널별 매출 및 이익 기여도"))
     st.plotly_chart(fig_channel, use_container_width=True)
@@ -456,99 +762,91 @@ tab_names = [
     "골든/데드크로스", "가격 저항성 분석", "연관 네트워크", "고객 생존 분석", "멀티채널 기여도",
     "목표 달성 트래커", "VIP 프로파일링", "AI 경영 비서", "통합 관제 센터"
 ]
-tabs = st.tabs(tab_names)
-tab_objs = tabs
-(tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, 
- tab11, tab12, tab13, tab14, tab15, tab16, tab17, tab18, tab19, tab20, 
- tab21, tab22, tab23, tab24, tab25, tab26, tab27, tab28, tab29, tab30, 
- tab31, tab32, tab33, tab34, tab35, tab36, tab37, tab38, tab39, tab40, 
- tab41, tab42, tab43, tab44, tab45, tab46, tab47, tab48, tab49, tab50) = tab_objs
-
-with tab1:
+# 탭 전환 시 재실행하여 선택된 탭 본문만 계산 (하단 render_tabN 디스패치 참고)
+tabs = st.tabs(tab_names, key="main_tabs", on_change="rerun")
+
+# 탭 내부 위젯 헬퍼 (선택되지 않은 탭의 위젯은 그려지지 않아 상태가 지워지므로,
+# 마지막 선택값을 별도 session_state 키에 보관했다가 탭을 다시 열 때 기본값으로 복원)
+def tab_widget(widget, label, options=None, *, key, default, **kwargs):
+    saved = st.session_state.get(f"saved_{key}", default)
+    if options is not None:
+        options = list(options)
+        value = widget(label, options, index=options.index(saved) if saved in options else 0, key=key, **kwargs)
+    else:
+        value = widget(label, value=saved, key=key, **kwargs)
+    st.session_state[f"saved_{key}"] = value
+    return value
+
+def render_tab1():
     c1, c2 = st.columns(2)
-    prod_agg = df.groupby(['상품코드', '상품명']).agg({
-        '주문번호': 'nunique',
-        '주문수량': 'sum',
-        '결제금액(상품별)': 'sum',
-        '공급가': 'sum',
-        'GP': 'sum'
-    }).reset_index()
-    prod_agg['마진율'] = np.where(prod_agg['결제금액(상품별)'] > 0, prod_agg['GP'] / prod_agg['결제금액(상품별)'], 0)
-    
     with c1:
         st.write("**매출 TOP 상품**")
-        st.dataframe(prod_agg.sort_values('결제금액(상품별)', ascending=False).head(10).style.format({'결제금액(상품별)': '{:,.0f}', '마진율': '{:.1%}'}))
+        st.dataframe(prod_agg.nlargest(10, '결제금액(상품별)').style.format({'결제금액(상품별)': '{:,.0f}', '마진율': '{:.1%}'}))
     with c2:
         st.write("**이익(GP) TOP 상품**")
-        st.dataframe(prod_agg.sort_values('GP', ascending=False).head(10).style.format({'GP': '{:,.0f}', '마진율': '{:.1%}'}))
+        st.dataframe(prod_agg.nlargest(10, 'GP').style.format({'GP': '{:,.0f}', '마진율': '{:.1%}'}))
 
-with tab2:
+def render_tab2():
     c1, c2 = st.columns(2)
-    seller_agg = df.groupby('셀러명').agg({
-        '주문번호': 'nunique',
-        '결제금액(상품별)': 'sum',
-        'GP': 'sum'
-    }).reset_index()
-    seller_agg.columns = ['셀러명', '주문건수', '매출', '이익(GP)']
     
     with c1:
         st.write("**셀러 매출 TOP 10**")
-        fig_seller_sales = apply_kr_font(px.bar(seller_agg.sort_values('매출', ascending=False).head(10), x='셀러명', y='매출', text_auto='.2s', color='매출', title="셀러별 매출 순위"))
+        fig_seller_sales = apply_kr_font(px.bar(seller_agg.nlargest(10, '매출'), x='셀러명', y='매출', text_auto='.2s', color='매출', title="셀러별 매출 순위"))
         st.plotly_chart(fig_seller_sales, use_container_width=True)
     with c2:
         st.write("**셀러 이익 TOP 10**")
-        fig_seller_gp = apply_kr_font(px.bar(seller_agg.sort_values('이익(GP)', ascending=False).head(10), x='셀러명', y='이익(GP)', text_auto='.2s', color='이익(GP)', title="셀러별 이익 순위"))
+        fig_seller_gp = apply_kr_font(px.bar(seller_agg.nlargest(10, '이익(GP)'), x='셀러명', y='이익(GP)', text_auto='.2s', color='이익(GP)', title="셀러별 이익 순위"))
         st.plotly_chart(fig_seller_gp, use_container_width=True)
 
-with tab3:
+def render_tab3():
     st.write("**기간별 상품 판매 트랜드**")
     res_col1, res_col2 = st.columns([1, 4])
     with res_col1:
-        resolution = st.radio("분석 단위", ["일별", "주별", "월별"], horizontal=True)
-        metric = st.selectbox("지표 선택", ["판매량", "매출", "이익(GP)"])
+        resolution = tab_widget(st.radio, "분석 단위", ["일별", "주별", "월별"], key="t3_resolution", default="일별", horizontal=True)
+        metric = tab_widget(st.selectbox, "지표 선택", ["판매량", "매출", "이익(GP)"], key="t3_metric", default="판매량")
         metric_col = {'판매량': '주문수량', '매출': '결제금액(상품별)', '이익(GP)': 'GP'}[metric]
     
-    top5_prods = prod_agg.sort_values('주문수량', ascending=False).head(5)['상품명'].tolist()
+    top5_prods = prod_agg.nlargest(5, '주문수량')['상품명'].tolist()
     if top5_prods:
-        df_trend = df[df['상품명'].isin(top5_prods)].copy()
+        freq = {"일별": "D", "주별": "W", "월별": "ME"}[resolution]
+        trend = df[df['상품명'].isin(top5_prods)].groupby([pd.Grouper(key='주문일', freq=freq), '상품명'], observed=True)[metric_col].sum()
         
-        # 리샘플링을 위해 인덱스 설정
-        df_trend = df_trend.set_index('주문일')
-        resample_map = {"일별": "D", "주별": "W", "월별": "M"}
-        
-        df_trend_resampled = df_trend.groupby(['상품명']).resample(resample_map[resolution])[metric_col].sum().reset_index()
+        # 상품별 첫 기간~마지막 기간 사이의 판매 없는 기간은 0으로 채움 (상품별 resample과 동일)
+        trend_wide = trend.unstack('상품명').asfreq(freq)
+        trend_wide = trend_wide.fillna(0).where(trend_wide.ffill().notna() & trend_wide.bfill().notna())
+        df_trend_resampled = (trend_wide.stack(future_stack=True).dropna().astype(trend.dtype).rename(metric_col).reset_index()
+                              .sort_values(['상품명', '주문일'], ignore_index=True))
         
         fig_trend = apply_kr_font(px.line(df_trend_resampled, x='주문일', y=metric_col, color='상품명', title=f"상위 5개 상품 {resolution} {metric} 추이"))
         st.plotly_chart(fig_trend, use_container_width=True)
 
-with tab4:
+def render_tab4():
     col_t1, col_t2 = st.columns(2)
     with col_t1:
         st.write("**고객 유형별 분석 (리텐션)**")
-        cust_agg = df.groupby('고객유형').agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
+        cust_agg = df.groupby('고객유형', observed=True).agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
         fig_cust = apply_kr_font(px.pie(cust_agg, values='결제금액(상품별)', names='고객유형', title="신규 vs 재구매 매출 비중", hole=0.4))
         st.plotly_chart(fig_cust, use_container_width=True)
     with col_t2:
         st.write("**회원 구분별 분석**")
-        mbr_agg = df.groupby('회원구분').agg({'결제금액(상품별)': 'sum'}).reset_index()
+        mbr_agg = df.groupby('회원구분', observed=True).agg({'결제금액(상품별)': 'sum'}).reset_index()
         fig_mbr = apply_kr_font(px.bar(mbr_agg, x='회원구분', y='결제금액(상품별)', text_auto='.2s', title="회원구분별 매출 성과"))
         st.plotly_chart(fig_mbr, use_container_width=True)
 
-with tab5:
+def render_tab5():
     st.write("**상품 ABC 분석 (매출 기여도 기반)**")
     # 누적 매출 비율 계산
     abc_df = prod_agg.sort_values('결제금액(상품별)', ascending=False).copy()
     abc_df['매출비중'] = abc_df['결제금액(상품별)'] / abc_df['결제금액(상품별)'].sum()
     abc_df['누적비중'] = abc_df['매출비중'].cumsum()
     
-    def classify_abc(row):
-        if row['누적비중'] <= 0.7: return 'A (핵심)'
-        elif row['누적비중'] <= 0.9: return 'B (전략)'
-        else: return 'C (관리)'
-    
-    abc_df['ABC등급'] = abc_df.apply(classify_abc, axis=1)
+    # 누적비중 0.7 이하: A / 0.9 이하: B / 그 외: C
+    abc_df['ABC등급'] = pd.Categorical.from_codes(
+        np.searchsorted([0.7, 0.9], abc_df['누적비중'].to_numpy(), side='left').astype(np.int8),
+        categories=['A (핵심)', 'B (전략)', 'C (관리)']
+    )
     
-    abc_summary = abc_df.groupby('ABC등급').agg({'상품명': 'count', '결제금액(상품별)': 'sum'}).reset_index()
+    abc_summary = abc_df.groupby('ABC등급', observed=True).agg({'상품명': 'count', '결제금액(상품별)': 'sum'}).reset_index()
     abc_summary.columns = ['등급', '상품수', '총매출']
     
     col_abc1, col_abc2 = st.columns([1, 2])
@@ -567,60 +865,58 @@ with tab5:
     
     st.info("💡 **경영 제언 & 분류 기준**: **A등급(누적매출 상위 70%)**은 재고 부족 방지에 집중하고, **B등급(70~90%)**은 마케팅 강화로 A등급 진입을 유도하세요. **C등급(하위 10%)**은 단종 또는 구성 변경을 검토해야 합니다.")
 
-with tab6:
+def render_tab6():
     st.write("**지역별 매출 분포**")
-    region_agg = df.groupby('지역').agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
-    region_agg.columns = ['지역', '매출', '주문건수']
     fig_region = apply_kr_font(px.pie(region_agg, values='매출', names='지역', title="지역별 매출 비중", hole=0.4))
     st.plotly_chart(fig_region, use_container_width=True)
     st.info(f"💡 **마케팅 팁**: 매출이 높은 **{top_region}** 지역을 타겟으로 한 지역 맞춤형 광고 집행을 권장합니다.")
 
-with tab7:
-    weight_agg = df.groupby('중량').agg({'주문수량': 'sum', '결제금액(상품별)': 'sum'}).reset_index()
+def render_tab7():
+    weight_agg = compute_weight_agg(filter_key, df)
     if not weight_agg.empty:
         fig_weight = apply_kr_font(px.pie(weight_agg, values='주문수량', names='중량', title="중량별 판매 비중"))
         st.plotly_chart(fig_weight, use_container_width=True)
         st.success(f"추천: 현재 가장 많이 팔리는 **{weight_agg.loc[weight_agg['주문수량'].idxmax(), '중량']}** 옵션을 메인 광고 소재로 활용하세요.")
 
-with tab8:
-    grade_agg = df.groupby('등급').agg({'주문수량': 'sum', '결제금액(상품별)': 'sum'}).reset_index()
+def render_tab8():
+    grade_agg = compute_grade_agg(filter_key, df)
     if not grade_agg.empty:
         fig_grade = apply_kr_font(px.bar(grade_agg, x='등급', y='주문수량', title="등급별 주문수량"))
         st.plotly_chart(fig_grade, use_container_width=True)
 
-with tab9:
+def render_tab9():
     st.write("**요일/시간별 주문 매출 분석 (광고 스케줄링 용)**")
-    time_pivot = df.pivot_table(index='주문요일', columns='주문시', values='결제금액(상품별)', aggfunc='sum').fillna(0)
+    # 요일(7) x 시간(24) 고정 격자에 매출을 바로 누적 (요일 카테고리 코드 * 24 + 시간)
+    dow = df['주문요일'].cat.codes.to_numpy().astype(np.intp)
+    valid = dow >= 0
+    cell = dow[valid] * 24 + df['주문시'].to_numpy()[valid]
+    heat = np.bincount(cell, weights=df['결제금액(상품별)'].to_numpy()[valid], minlength=7 * 24).reshape(7, 24)
+    time_pivot = pd.DataFrame(heat, index=pd.Index(df['주문요일'].cat.categories, name='주문요일'), columns=pd.Index(range(24), name='주문시'))
     fig_time = apply_kr_font(px.imshow(time_pivot, text_auto=False, color_continuous_scale='YlGnBu', title="요일/시간별 매출 히트맵"))
     st.plotly_chart(fig_time, use_container_width=True)
     st.success(f"🎯 **광고 전략**: 가장 주문이 활발한 **{top_day} {top_hour}시 전후**에 광고 예산을 집중하세요.")
 
-with tab10:
+def render_tab10():
     st.write("**프로모션(할인) 효율성 분석**")
-    promo_agg = df.groupby(['주문경로']).agg({'결제금액(상품별)': 'sum', '총할인액': 'sum', 'GP': 'sum'}).reset_index()
+    promo_agg = df.groupby(['주문경로'], observed=True).agg({'결제금액(상품별)': 'sum', '총할인액': 'sum', 'GP': 'sum'}).reset_index()
     promo_agg['할인율'] = np.where(promo_agg['결제금액(상품별)'] > 0, promo_agg['총할인액'] / promo_agg['결제금액(상품별)'], 0)
     promo_agg['순이익률'] = np.where(promo_agg['결제금액(상품별)'] > 0, promo_agg['GP'] / promo_agg['결제금액(상품별)'], 0)
     fig_promo = apply_kr_font(px.scatter(promo_agg, x='할인율', y='순이익률', size='결제금액(상품별)', color='주문경로', title="할인율 대비 순이익률 (채널별)"))
     st.plotly_chart(fig_promo, use_container_width=True)
 
-with tab11:
+def render_tab11():
     st.write("**장바구니 연관 상품 분석 (함께 구매되는 상품)**")
-    order_groups = df.groupby('주문번호')['상품명'].apply(list).reset_index()
-    multi_orders = order_groups[order_groups['상품명'].apply(len) > 1]
-    if not multi_orders.empty:
-        from collections import Counter
-        from itertools import combinations
-        pairs = Counter()
-        for row in multi_orders['상품명']:
-            pairs.update(combinations(sorted(set(row)), 2))
-        pair_df = pd.DataFrame(pairs.most_common(10), columns=['연관상품쌍', '동시구매건수'])
+    pair_counts = compute_basket_pairs(filter_key, df)
+    if not pair_counts.empty:
+        pair_counts = pair_counts.nlargest(10)
+        pair_df = pd.DataFrame({'연관상품쌍': pair_counts.index.to_flat_index(), '동시구매건수': pair_counts.to_numpy()})
         st.dataframe(pair_df)
         st.success("🍱 **번들링 제언**: 위 연관 상품들을 '세트 메뉴'로 구성하여 업셀링을 유도하십시오.")
 
-with tab12:
+def render_tab12():
     st.write("**RFM 기반 고객 세그먼트 분석 (가치 등급)**")
     if '고객세그먼트' in df.columns:
-        seg_agg = df.groupby('고객세그먼트').agg({'주문자연락처': 'nunique', '결제금액(상품별)': 'sum'}).reset_index()
+        seg_agg = df.groupby('고객세그먼트', observed=True).agg({'주문자연락처': 'nunique', '결제금액(상품별)': 'sum'}).reset_index()
         seg_agg.columns = ['세그먼트', '고객수', '총매출']
         col_rfm1, col_rfm2 = st.columns([1, 2])
         with col_rfm1: st.dataframe(seg_agg.style.format({'총매출': '{:,.0f}'}))
@@ -629,7 +925,7 @@ with tab12:
             st.plotly_chart(fig_rfm, use_container_width=True)
     else: st.write("고객 정보를 분석할 수 없습니다.")
 
-with tab13:
+def render_tab13():
     st.write("**미래 매출 예측 (최근 추세 기반)**")
     daily_sales = df.set_index('주문일')['결제금액(상품별)'].resample('D').sum().reset_index()
     daily_sales.columns = ['날짜', '실제매출']
@@ -643,45 +939,37 @@ with tab13:
         st.plotly_chart(fig_pred, use_container_width=True)
     else: st.write("예측을 위한 충분한 데이터가 부족합니다.")
 
-with tab14:
+def render_tab14():
     st.write("**상품명 핵심 키워드 성과 분석**")
-    keywords = []
-    for idx, row in prod_agg.iterrows():
-        words = str(row['상품명']).split()
-        for word in words:
-            clean_word = re.sub(r'[^가-힣a-zA-Z0-9]', '', word)
-            if len(clean_word) >= 2:
-                keywords.append({'키워드': clean_word, '매출': row['결제금액(상품별)'], '건수': row['주문번호']})
-    key_df = pd.DataFrame(keywords)
+    # 공백 단위로 나눈 뒤 특수문자를 제거하고 2글자 이상만 키워드로 사용
+    key_df = prod_agg[['결제금액(상품별)', '주문번호']].assign(키워드=prod_agg['상품명'].astype(str).str.split()).explode('키워드')
+    key_df['키워드'] = key_df['키워드'].str.replace(r'[^가-힣a-zA-Z0-9]', '', regex=True)
+    key_df = key_df[key_df['키워드'].str.len() >= 2]
     if not key_df.empty:
-        key_agg = key_df.groupby('키워드').agg({'매출': 'sum', '건수': 'sum'}).sort_values('매출', ascending=False).head(20).reset_index()
+        key_agg = key_df.groupby('키워드').agg(매출=('결제금액(상품별)', 'sum'), 건수=('주문번호', 'sum')).nlargest(20, '매출').reset_index()
         fig_key = apply_kr_font(px.bar(key_agg, x='매출', y='키워드', orientation='h', color='건수', title="상위 20개 성과 키워드"))
         st.plotly_chart(fig_key, use_container_width=True)
 
-with tab15:
+def render_tab15():
     st.write("**월별 코호트 리텐션 분석 (고객 잔존율)**")
     if '첫구매월' in df.columns:
-        cohort_counts = df.groupby(['첫구매월', '코호트_경과'])['주문자연락처'].nunique().reset_index()
-        cohort_pivot = cohort_counts.pivot(index='첫구매월', columns='코호트_경과', values='주문자연락처')
-        cohort_size = cohort_pivot.iloc[:, 0]
-        retention = cohort_pivot.divide(cohort_size, axis=0)
-        retention.index = retention.index.astype(str)
+        retention = compute_cohort_retention(filter_key, df)
         fig_cohort = apply_kr_font(px.imshow(retention, text_auto='.1%', color_continuous_scale='Blues', title="월별 리텐션 코호트"))
         st.plotly_chart(fig_cohort, use_container_width=True)
         st.info("💡 **전략**: Month 1의 잔존율을 높이기 위한 첫 구매 후 리마케팅(CRM)을 강화하십시오.")
 
-with tab16:
+def render_tab16():
     st.write("**취소 및 반품 리스크 분석 (손실 방어)**")
     cancel_df = df[df['주문취소 금액(상품별)'] > 0]
     if not cancel_df.empty:
-        cancel_agg = cancel_df.groupby('상품명').agg({'주문취소 금액(상품별)': 'sum', '주문번호': 'count'}).sort_values('주문취소 금액(상품별)', ascending=False).head(10).reset_index()
+        cancel_agg = cancel_df.groupby('상품명', observed=True).agg({'주문취소 금액(상품별)': 'sum', '주문번호': 'count'}).nlargest(10, '주문취소 금액(상품별)').reset_index()
         fig_cancel = apply_kr_font(px.bar(cancel_agg, x='주문취소 금액(상품별)', y='상품명', orientation='h', title="상품별 취소 금액 TOP 10"))
         st.plotly_chart(fig_cancel, use_container_width=True)
         st.error("⚠️ **품질 경고**: 위 리스트의 상품들은 배송 지연이나 품질 불만족 이슈가 잦을 수 있습니다. 즉시 현장을 점검하세요.")
     else:
         st.write("취소 데이터가 없습니다.")
 
-with tab17:
+def render_tab17():
     st.write("**고객 생애 가치(LTV) 및 획득 분석**")
     if '누적매출' in df.columns:
         avg_ltv = df['누적매출'].mean()
@@ -689,37 +977,39 @@ with tab17:
         st.success(f"평균 고객 생애 가치(LTV): **{avg_ltv:,.0f}원** | 최고 가치 고객: **{max_ltv:,.0f}원**")
         
         # 누적 매출 집계 차트
-        fig_ltv = apply_kr_font(px.histogram(df.drop_duplicates('주문자연락처'), x='누적매출', nbins=50, title="고객별 누적 매출액 분포"))
+        fig_ltv = apply_kr_font(px.histogram(compute_cust_df(filter_key, df), x='누적매출', nbins=50, title="고객별 누적 매출액 분포"))
         st.plotly_chart(fig_ltv, use_container_width=True)
         st.info("💡 **경영 제언**: 평균 LTV 이내의 비용으로 신규 고객을 획득(CAC)한다면 장기적으로 수익성이 보장됩니다.")
     else:
         st.write("LTV 분석을 위한 주문자 식별값이 없습니다.")
 
-with tab18:
+def render_tab18():
     st.write("**할인 민감도 분석 (가격 탄력성 간이 진단)**")
     # 할인액이 있는 주문과 없는 주문의 평균 주문수량 비교
-    df['할인여부'] = np.where(df['총할인액'] > 0, "할인적용", "정상가")
-    discount_sens = df.groupby(['상품명', '할인여부']).agg({'주문수량': 'mean', '결제금액(상품별)': 'count'}).reset_index()
+    # (공유 df를 변경하지 않도록 구분값은 별도 Series 키로 사용)
+    discount_flag = pd.Series(np.where(df['총할인액'] > 0, "할인적용", "정상가"), index=df.index, name='할인여부')
+    discount_sens = df.groupby(['상품명', discount_flag], observed=True).agg({'주문수량': 'mean', '결제금액(상품별)': 'count'}).reset_index()
     discount_sens.columns = ['상품명', '할인여부', '평균주문량', '주문건수']
     
     fig_sens = apply_kr_font(px.bar(discount_sens.head(20), x='상품명', y='평균주문량', color='할인여부', barmode='group', title="할인 여부별 평균 주문량 비교 (상위 10개 상품)"))
     st.plotly_chart(fig_sens, use_container_width=True)
     st.info("💡 **전략**: 할인을 적용했을 때 주문량이 급증하는 상품은 '가격 민감' 상품입니다. 반면 차이가 적은 상품은 브랜딩 중심의 정가 판매를 권장합니다.")
 
-with tab19:
+def render_tab19():
     st.write("**지역별 전략 상품군 (Place Target)**")
-    region_prod = df.groupby(['지역', '상품명']).agg({'결제금액(상품별)': 'sum'}).reset_index()
+    region_prod = compute_region_prod_agg(filter_key, df)
     # 지역별 최고 매출 상품 추출
-    top_region_prod = region_prod.sort_values(['지역', '결제금액(상품별)'], ascending=[True, False]).groupby('지역').head(1)
+    top_region_prod = region_prod.loc[region_prod.groupby('지역', observed=True)['결제금액(상품별)'].idxmax()]
     
     st.dataframe(top_region_prod.style.format({'결제금액(상품별)': '{:,.0f}'}))
     st.success("🎯 **지역 타겟팅**: 위 리스트를 바탕으로 특정 지역 광고 집행 시 해당 지역 선호도 1위 상품을 메인으로 노출하십시오.")
 
-with tab20:
+def render_tab20():
     st.write("**매출 집중도 및 의존도 리스크 분석**")
     # 파레토 법칙(80/20) 확인
     pareto_df = prod_agg.sort_values('결제금액(상품별)', ascending=False).copy()
-    pareto_df['누적매출비중'] = (pareto_df['결제금액(상품별)'].cumsum() / pareto_df['결제금액(상품별)'].sum()) * 100
+    cum_sales = pareto_df['결제금액(상품별)'].cumsum()
+    pareto_df['누적매출비중'] = (cum_sales / cum_sales.iloc[-1]) * 100
     
     top_20_pct_count = max(1, int(len(pareto_df) * 0.2))
     sales_from_top_20 = pareto_df.iloc[:top_20_pct_count]['누적매출비중'].iloc[-1]
@@ -729,21 +1019,17 @@ with tab20:
         st.metric("상위 20% 상품 매출 비중", f"{sales_from_top_20:.1f}%")
         st.caption("비중이 80%를 넘을 경우 특정 상품 의존도가 매우 높음")
     with col_p2:
-        top_seller_pct = (seller_agg['매출'].max() / seller_agg['매출'].sum()) * 100
+        seller_stats = seller_agg['매출'].agg(['max', 'sum'])
+        top_seller_pct = (seller_stats['max'] / seller_stats['sum']) * 100
         st.metric("1위 셀러 매출 의존도", f"{top_seller_pct:.1f}%")
         
     fig_pareto = apply_kr_font(px.line(pareto_df.reset_index(), x=range(len(pareto_df)), y='누적매출비중', title="매출 누적 분포 곡선 (기울기가 가팔수록 편중 심함)"))
     st.plotly_chart(fig_pareto, use_container_width=True)
     st.warning("💡 **리스크 관리**: 상위 상품/셀러에 의존도가 너무 높다면 해당 파트너의 이탈이나 단종 시 타격이 큽니다. 포트폴리오 다변화가 필요합니다.")
 
-with tab21:
+def render_tab21():
     st.write("**주말 vs 평일 구매 모멘텀 분석**")
-    weekend_agg = df.groupby('주말여부').agg({
-        '결제금액(상품별)': 'sum',
-        '주문번호': 'nunique',
-        '주문수량': 'sum'
-    }).reset_index()
-    weekend_agg['객단가'] = np.where(weekend_agg['주문번호'] > 0, weekend_agg['결제금액(상품별)'] / weekend_agg['주문번호'], 0)
+    weekend_agg = compute_weekend_agg(filter_key, df)
     
     col_w1, col_w2 = st.columns(2)
     with col_w1:
@@ -755,41 +1041,25 @@ with tab21:
     
     st.info("💡 **전략**: 주말 객단가가 높다면 금요일 오후에 '주말 특가 세트' 프로모션을, 평일 비중이 높다면 출퇴근 시간대 타겟 광고를 강화하세요.")
 
-with tab22:
+def render_tab22():
     st.write("**상품 성장 매트릭스 (Sales Volume vs Growth)**")
     # 기간 내 매출과 이전 기간(동일 일수) 매출 비교를 위한 로직
     # 여기서는 간단히 전체 데이터 대비 현재 필터 데이터의 비중과 평균 매출로 매트릭스 구성
-    prod_growth = df.groupby('상품명').agg({'결제금액(상품별)': 'sum', '주문수량': 'sum'}).reset_index()
-    avg_sales = prod_growth['결제금액(상품별)'].mean()
-    avg_qty = prod_growth['주문수량'].mean()
-    
-    def classify_growth(row):
-        if row['결제금액(상품별)'] >= avg_sales and row['주문수량'] >= avg_qty: return 'Star (주력성장)'
-        elif row['결제금액(상품별)'] >= avg_sales and row['주문수량'] < avg_qty: return 'Cash Cow (수익효자)'
-        elif row['결제금액(상품별)'] < avg_sales and row['주문수량'] >= avg_qty: return 'Wild Card (박리다매)'
-        else: return 'Dog (관리대상)'
-    
-    prod_growth['성장단계'] = prod_growth.apply(classify_growth, axis=1)
+    prod_growth = compute_prod_growth(filter_key, df)
     
     fig_matrix = apply_kr_font(px.scatter(prod_growth, x='주문수량', y='결제금액(상품별)', color='성장단계', size='결제금액(상품별)', hover_name='상품명', title="상품 포트폴리오 성장 매트릭스"))
     st.plotly_chart(fig_matrix, use_container_width=True)
     st.info("💡 **경영 제언**: **Star** 상품은 광고비를 증액하고, **Cash Cow**는 수익을 극대화하며, **Dog** 제품군은 리뉴얼이나 단종을 검토하십시오.")
 
-with tab23:
+def render_tab23():
     st.write("**신규 vs 기존 상품 매출 기여도 (Product Mix)**")
-    # 첫 구매일 기준으로 신규 상품(최근 3개월 내 첫 등장) 구분
-    prod_first_seen = df_raw.groupby('상품명')['주문일'].min().reset_index()
-    cutoff_date = df_raw['주문일'].max() - pd.Timedelta(days=90)
-    new_prods = prod_first_seen[prod_first_seen['주문일'] > cutoff_date]['상품명'].tolist()
-    
-    df['상품구분'] = np.where(df['상품명'].isin(new_prods), "신규상품", "기존상품")
-    mix_agg = df.groupby('상품구분')['결제금액(상품별)'].sum().reset_index()
+    mix_agg = compute_product_mix(filter_key, df, compute_new_products(data_key, df_raw))
     
     fig_mix = apply_kr_font(px.pie(mix_agg, values='결제금액(상품별)', names='상품구분', title="신규 vs 기존 상품 매출 비중"))
     st.plotly_chart(fig_mix, use_container_width=True)
     st.warning("💡 **리스크**: 신규 상품 비중이 너무 낮다면 비즈니스가 노화되고 있다는 신호입니다. 지속적인 신제품 출시 및 테스팅이 필요합니다.")
 
-with tab24:
+def render_tab24():
     st.write("**배송 및 물류 효율 분석 (Logistics Lead Time)**")
     if '배송리드타임' in df.columns:
         lead_time_agg = df.groupby('주문일')['배송리드타임'].mean().reset_index()
@@ -802,7 +1072,7 @@ with tab24:
     else:
         st.write("배송 데이터가 부족합니다.")
 
-with tab25:
+def render_tab25():
     st.write("**고객 재구매 주기 분석 (Purchase Cycle)**")
     if '구매간격' in df.columns:
         valid_intervals = df[df['구매간격'] > 0]
@@ -818,10 +1088,10 @@ with tab25:
     else:
         st.write("재구매 분석을 위한 주문자 식별값이 없습니다.")
 
-with tab26:
+def render_tab26():
     st.write("**VIP 및 기존 고객 이탈 리스크 분석 (Churn Watch)**")
     if '이탈위험도' in df.columns:
-        churn_agg = df.drop_duplicates('주문자연락처').groupby('이탈위험도').agg({
+        churn_agg = compute_cust_df(filter_key, df).groupby('이탈위험도', observed=True).agg({
             '주문자연락처': 'count',
             '누적매출': 'sum'
         }).reset_index()
@@ -839,10 +1109,10 @@ with tab26:
     else:
         st.write("이탈 분석 데이터가 없습니다.")
 
-with tab27:
+def render_tab27():
     st.write("**채널별 고객 가치(LTV) 기여도 분석 (Channel ROI)**")
     if '누적매출' in df.columns:
-        channel_ltv = df.groupby('주문경로').agg({'누적매출': 'mean', '결제금액(상품별)': 'sum'}).reset_index()
+        channel_ltv = df.groupby('주문경로', observed=True).agg({'누적매출': 'mean', '결제금액(상품별)': 'sum'}).reset_index()
         channel_ltv.columns = ['주문경로', '평균LTV', '총매출기여']
         fig_cltv = apply_kr_font(px.bar(channel_ltv, x='주문경로', y='평균LTV', color='총매출기여', text_auto='.2s', title="채널별 고객 1인당 평균 생애 가치(LTV)"))
         st.plotly_chart(fig_cltv, use_container_width=True)
@@ -850,18 +1120,19 @@ with tab27:
     else:
         st.write("채널별 가치 분석 데이터가 부족합니다.")
 
-with tab28:
+def render_tab28():
     st.write("**고객 리텐션을 유발하는 '마법의 앵커 상품' 분석**")
     if '최초구매상품' in df.columns:
         # 고객별 재구매 여부 데이터와 결합
-        cust_status = df.drop_duplicates('주문자연락처')[['주문자연락처', '최초구매상품', '재구매여부']]
-        anchor_agg = cust_status.groupby('최초구매상품').agg({
+        cust_df = compute_cust_df(filter_key, df)
+        cust_status = cust_df[['주문자연락처', '최초구매상품']].assign(재구매여부=(cust_df['재구매여부'] == '재구매').astype(np.int8))
+        anchor_agg = cust_status.groupby('최초구매상품', observed=True).agg({
             '주문자연락처': 'count',
-            '재구매여부': lambda x: (x == '재구매').sum()
+            '재구매여부': 'sum'
         }).reset_index()
         anchor_agg.columns = ['상품명', '처음구매고객수', '재구매전환수']
         anchor_agg['재구매전환율'] = (anchor_agg['재구매전환수'] / anchor_agg['처음구매고객수']) * 100
-        anchor_agg = anchor_agg[anchor_agg['처음구매고객수'] >= 5].sort_values('재구매전환율', ascending=False).head(15)
+        anchor_agg = anchor_agg[anchor_agg['처음구매고객수'] >= 5].nlargest(15, '재구매전환율')
         
         fig_anchor = apply_kr_font(px.bar(anchor_agg, x='재구매전환율', y='상품명', orientation='h', color='처음구매고객수', title="첫 구매 후 재구매를 가장 많이 유도하는 앵커 상품 TOP 15"))
         st.plotly_chart(fig_anchor, use_container_width=True)
@@ -869,29 +1140,27 @@ with tab28:
     else:
         st.write("앵커 분석 데이터가 부족합니다.")
 
-with tab29:
+def render_tab29():
     st.write("**고객 세그먼트별 상품 포트폴리오 믹스 (Segment Match)**")
     if '고객세그먼트' in df.columns:
-        seg_prod_mix = df.groupby(['고객세그먼트', '상품명'])['결제금액(상품별)'].sum().reset_index()
-        top_seg_prod = seg_prod_mix.sort_values(['고객세그먼트', '결제금액(상품별)'], ascending=[True, False]).groupby('고객세그먼트').head(5)
+        seg_prod_mix = df.groupby(['고객세그먼트', '상품명'], observed=True)['결제금액(상품별)'].sum()
+        # 세그먼트별 매출 상위 5개 상품 (전체 정렬 없이 그룹 내 nlargest)
+        top_seg_prod = seg_prod_mix.groupby(level='고객세그먼트', observed=True, group_keys=False).nlargest(5).reset_index()
         fig_mix_seg = apply_kr_font(px.bar(top_seg_prod, x='결제금액(상품별)', y='상품명', color='고객세그먼트', barmode='group', title="고객 등급별 선호 상품 Top 5"))
         st.plotly_chart(fig_mix_seg, use_container_width=True)
         st.success("🎯 **타켓팅 제언**: VIP 고객이 선호하는 고단가/고품질 상품과 신규 고객이 입문하는 저단가 상품을 구분하여 개인화 메시지를 구성하십시오.")
     else:
         st.write("세그먼트 상품 매칭 데이터가 부족합니다.")
 
-with tab30:
+def render_tab30():
     st.write("**가격대별 매출 및 주문수량 분포 (Price Band Analysis)**")
-    price_agg = df.groupby('가격대').agg({'결제금액(상품별)': 'sum', '주문번호': 'nunique'}).reset_index()
-    # 가격 순서대로 정렬하기 위해 숫자 추출
-    price_agg['price_val'] = price_agg['가격대'].str.replace(',', '').str.extract('(\d+)').astype(int)
-    price_agg = price_agg.sort_values('price_val')
+    price_agg = compute_price_band_agg(filter_key, df)
     
     fig_price = apply_kr_font(px.bar(price_agg, x='가격대', y='결제금액(상품별)', text_auto='.2s', title="가격대 구간별 매출 기여도"))
     st.plotly_chart(fig_price, use_container_width=True)
     st.info("💡 **전략**: 매출이 가장 집중되는 '골든 가격대'를 확인하세요. 해당 구간의 상품군을 다양화하는 것이 매출 증대의 지름길입니다.")
 
-with tab31:
+def render_tab31():
     st.write("**할인 수단별 효율성 비교 (Coupon vs Point ROI)**")
     promo_compare = pd.DataFrame({
         '수단': ['쿠폰', '포인트'],
@@ -908,15 +1177,13 @@ with tab31:
         st.plotly_chart(fig_pro_pie, use_container_width=True)
     st.success("💡 **경영 제언**: 동일 비용 대비 매출 견인 효과가 더 큰 수단에 마케팅 예산을 우선 배정하십시오.")
 
-with tab32:
+def render_tab32():
     st.write("**재고 회전 효율 분석 (Slow/Fast Movers)**")
-    # 회전율 지표가 높을수록 한번 주문 시 대량 판매, 낮을수록 소량/빈번 판매
-    inv_agg = df.groupby('상품명').agg({'주문수량': 'sum', '주문번호': 'nunique', '결제금액(상품별)': 'sum'}).reset_index()
-    inv_agg['회전력'] = inv_agg['주문수량'] / inv_agg['주문번호']
+    inv_agg = compute_inventory_agg(filter_key, df)
     
     col_inv1, col_inv2 = st.columns(2)
     with col_inv1:
-        fast_movers = inv_agg.sort_values('주문수량', ascending=False).head(10)
+        fast_movers = inv_agg.nlargest(10, '주문수량')
         fig_fast = apply_kr_font(px.bar(fast_movers, x='주문수량', y='상품명', orientation='h', title="전체 판매량 TOP 10 (Fast Movers)"))
         st.plotly_chart(fig_fast, use_container_width=True)
     with col_inv2:
@@ -925,16 +1192,17 @@ with tab32:
         st.plotly_chart(fig_slow, use_container_width=True)
     st.warning("💡 **운영 팁**: 판매량이 낮고 주문당 효율이 떨어지는 제품은 재고 체류 비용이 발생합니다. 번들 상품으로 구성하여 빠른 소진을 유도하세요.")
 
-with tab33:
+def render_tab33():
     st.write("**경영 수익 시뮬레이션 (What-if Analysis)**")
-    curr_revenue = df['결제금액(상품별)'].sum()
-    curr_gp = df['GP'].sum()
+    kpis = compute_kpis(filter_key, df)
+    curr_revenue = kpis['total_sales']
+    curr_gp = kpis['total_gp']
     curr_margin = (curr_gp / curr_revenue * 100) if curr_revenue > 0 else 0
     st.info(f"현재 총 매출: **{curr_revenue:,.0f}원** | 현재 총 이익: **{curr_gp:,.0f}원** (마진율: **{curr_margin:.1f}%**)")
     col_s1, col_s2 = st.columns(2)
     with col_s1:
-        sim_discount_change = st.slider("평균 할인율 조정 (%)", -20, 20, 0)
-        sim_qty_change = st.slider("예상 판매량 변화 (%)", -50, 50, 0)
+        sim_discount_change = tab_widget(st.slider, "평균 할인율 조정 (%)", key="t33_discount", default=0, min_value=-20, max_value=20)
+        sim_qty_change = tab_widget(st.slider, "예상 판매량 변화 (%)", key="t33_qty", default=0, min_value=-50, max_value=50)
     sim_rev = curr_revenue * (1 + sim_qty_change/100) * (1 - sim_discount_change/100)
     sim_gp = curr_gp * (1 + sim_qty_change/100) - (curr_revenue * sim_discount_change/100)
     sim_margin = (sim_gp / sim_rev * 100) if sim_rev > 0 else 0
@@ -943,39 +1211,44 @@ with tab33:
         st.metric("시뮬레이션 영업이익", f"{sim_gp:,.0f}원", delta=f"{sim_gp - curr_gp:,.0f}")
     st.success(f"📈 위 시나리오 적용 시 마진율은 **{sim_margin:.1f}%**입니다. 목표 이익 달성을 위한 최적의 할인율과 판매량 조합을 찾으세요.")
 
-with tab34:
+def render_tab34():
     st.write("**상품간 매출 상관관계 (Cannibalization Analysis)**")
     # 상위 10개 상품의 일자별 매출 상관관계 분석
-    top_prods_list = df.groupby('상품명')['결제금액(상품별)'].sum().sort_values(ascending=False).head(10).index.tolist()
-    daily_prod_sales = df[df['상품명'].isin(top_prods_list)].groupby(['주문일', '상품명'])['결제금액(상품별)'].sum().unstack().fillna(0)
+    daily_prod_sales = compute_daily_prod_sales(filter_key, df)
     
     if len(daily_prod_sales) > 1:
-        corr_matrix = daily_prod_sales.corr()
+        # fillna(0) 이후라 결측이 없으므로 pandas의 쌍별 corr 대신 np.corrcoef 한 번으로 계산 (매출이 일정한 상품은 NaN)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.atleast_2d(np.corrcoef(daily_prod_sales.to_numpy(dtype=np.float64).T))
+        corr_matrix = pd.DataFrame(corr, index=daily_prod_sales.columns, columns=daily_prod_sales.columns)
         fig_corr = apply_kr_font(px.imshow(corr_matrix, text_auto=True, title="상위 상품간 매출 상관계수 (음수값이 높으면 카니벌라이제이션 우려)"))
         st.plotly_chart(fig_corr, use_container_width=True)
         st.warning("⚠️ **분석 가이드**: 상관계수가 **강한 음수(-0.5 이하)**인 상품 조합은 서로의 매출을 갉아먹고 있을 가능성이 높습니다. 프로모션 겹침이나 타겟 중복을 점검하세요.")
     else:
         st.write("상관관계 분석을 위한 시계열 데이터가 부족합니다.")
 
-with tab35:
+def render_tab35():
     st.write("**채널별 초정밀 파워 타임 분석 (Channel Peak Time)**")
-    channel_hour_pivot = df.pivot_table(index='주문시', columns='주문경로', values='결제금액(상품별)', aggfunc='sum').fillna(0)
+    channel_hour_pivot = compute_channel_hour_pivot(filter_key, df)
     fig_ch_hour = apply_kr_font(px.imshow(channel_hour_pivot, aspect='auto', title="채널 x 시간대별 매출 밀도 (Golden Slot 탐색)"))
     st.plotly_chart(fig_ch_hour, use_container_width=True)
     st.success("🎯 **미디어 믹스 전략**: 각 채널별로 매출이 집중되는 시간대가 다릅니다. 특정 채널의 '골든 타임' 1~2시간 전부터 집중 광고를 태우면 효율이 극대화됩니다.")
 
-with tab36:
+def render_tab36():
     st.write("**전략 경영 KPI 스코어카드 (Business Health Scorecard)**")
     # 주요 지표를 경영 효율 관점에서 요약
+    kpis = compute_kpis(filter_key, df)
     kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
     with kpi_col1:
-        repurchase_rate = (df[df['재구매여부']=='재구매']['주문자연락처'].nunique() / df['주문자연락처'].nunique() * 100) if df['주문자연락처'].nunique() > 0 else 0
+        # 재구매여부는 고객 단위 값이므로 고객 테이블에서 바로 셈 (전체 행 필터링 불필요)
+        repurchase_cust = (compute_cust_df(filter_key, df)['재구매여부'] == '재구매').sum()
+        repurchase_rate = (repurchase_cust / kpis['customer_count'] * 100) if kpis['customer_count'] > 0 else 0
         st.metric("고객 재구매율", f"{repurchase_rate:.1f}%", help="전체 고객 중 재구매 고객의 비중")
     with kpi_col2:
-        avg_basket = df['결제금액(상품별)'].sum() / df['주문번호'].nunique() if df['주문번호'].nunique() > 0 else 0
+        avg_basket = kpis['total_sales'] / kpis['order_count'] if kpis['order_count'] > 0 else 0
         st.metric("평균 객단가 (AOV)", f"{avg_basket:,.0f}원", help="주문 1건당 평균 결제 금액")
     with kpi_col3:
-        profit_efficiency = (df['GP'].sum() / df['결제금액(상품별)'].sum() * 100) if df['결제금액(상품별)'].sum() > 0 else 0
+        profit_efficiency = (kpis['total_gp'] / kpis['total_sales'] * 100) if kpis['total_sales'] > 0 else 0
         st.metric("매출 대비 이익률", f"{profit_efficiency:.1f}%", help="전체 매출에서 매출총이익(GP)이 차지하는 비중")
     
     st.markdown("---")
@@ -986,9 +1259,9 @@ with tab36:
     if profit_efficiency < 10: st.warning("⚠️ **수익성 주의**: 매출 규모에 비해 남는 것이 적습니다. 할인 정책을 재검토하고 고마진 상품 믹스를 확대하세요.")
     else: st.info("✅ **수익 구조 건강**: 현재의 마진 구조를 유지하면서 점유율을 확대하는 전략이 유효합니다.")
 
-with tab37:
+def render_tab37():
     st.write("**수익성-매출 규모 효율 매트릭스 (ABC-GP Efficiency Matrix)**")
-    eff_df = df.groupby('상품명').agg({'결제금액(상품별)': 'sum', '마진율': 'mean', 'GP': 'sum'}).reset_index()
+    eff_df = compute_prod_stats(filter_key, df)[['결제금액(상품별)', '마진율', 'GP']].reset_index()
     avg_rev = eff_df['결제금액(상품별)'].median()
     avg_mar = eff_df['마진율'].median()
     fig_eff = apply_kr_font(px.scatter(eff_df, x='결제금액(상품별)', y='마진율', size='GP', color='마진율',
@@ -998,15 +1271,15 @@ with tab37:
     st.plotly_chart(fig_eff, use_container_width=True)
     st.info("💡 **매트릭스 해석**: 우측 상단은 **'성배(Holy Grail, 고매출-고마진)'** 상품입니다. 좌측 하단은 **'정리 대상'** 상품입니다. 우측 하단은 **'미끼 상품(Traffic Driver)'**으로 활용하십시오.")
 
-with tab38:
+def render_tab38():
     st.write("**고객 구매 패턴 여정 분석 (Customer Success Path)**")
     # 고객별 구매 순서대로 상품 나열 (최대 3개 단계)
     if '주문자연락처' in df.columns:
         df_sorted = df.sort_values(['주문자연락처', '주문일'])
-        df_sorted['구매순서'] = df_sorted.groupby('주문자연락처').cumcount() + 1
-        journey = df_sorted[df_sorted['구매순서'] <= 3].pivot_table(index='주문자연락처', columns='구매순서', values='상품명', aggfunc='first')
+        df_sorted['구매순서'] = df_sorted.groupby('주문자연락처', observed=True).cumcount() + 1
+        journey = df_sorted[df_sorted['구매순서'] <= 3].pivot_table(index='주문자연락처', columns='구매순서', values='상품명', aggfunc='first', observed=True)
         journey.columns = [f'Step_{c}' for c in journey.columns]
-        journey_path = journey.groupby(['Step_1', 'Step_2']).size().reset_index(name='count').sort_values('count', ascending=False).head(10)
+        journey_path = journey.groupby(['Step_1', 'Step_2'], observed=True).size().nlargest(10).reset_index(name='count')
         
         fig_journey = apply_kr_font(px.bar(journey_path, x='count', y='Step_2', color='Step_1', title="주요 고객 구매 여정 (1단계 -> 2단계)"))
         st.plotly_chart(fig_journey, use_container_width=True)
@@ -1014,10 +1287,10 @@ with tab38:
     else:
         st.write("고객 여정 분석 데이터가 부족합니다.")
 
-with tab39:
+def render_tab39():
     st.write("**광고 예산 최적 배분 가이드 (Budget Optimizer)**")
     # 채널별 LTV와 기여도 기반 다음 달 예산 분배 추천
-    budget_base = df.groupby('주문경로').agg({'결제금액(상품별)': 'sum', '주문자연락처': 'nunique'}).reset_index()
+    budget_base = df.groupby('주문경로', observed=True).agg({'결제금액(상품별)': 'sum', '주문자연락처': 'nunique'}).reset_index()
     budget_base['LTV'] = budget_base['결제금액(상품별)'] / budget_base['주문자연락처']
     total_ltv = budget_base['LTV'].sum()
     budget_base['권장배분비중(%)'] = (budget_base['LTV'] / total_ltv * 100)
@@ -1031,41 +1304,34 @@ with tab39:
         st.dataframe(budget_base[['주문경로', 'LTV', '권장배분비중(%)']].style.format({'LTV': '{:,.0f}', '권장배분비중(%)': '{:.1f}%'}))
     st.info("💡 **전략 제언**: 단순히 매출이 높은 곳보다 '고객 가치(LTV)'가 높은 채널에 예산을 비중 있게 배정하는 것이 장기적으로 수익에 유리합니다.")
 
-with tab40:
+def render_tab40():
     st.write("**비즈니스 핵심 체력 진단 (Vitality - Trend Decomposition)**")
     # 이동평균을 활용하여 계절성을 제거한 순수 트렌드 추출
-    daily_sales = df.groupby('주문일')['결제금액(상품별)'].sum().reset_index()
-    daily_sales['Trend(7D)'] = daily_sales['결제금액(상품별)'].rolling(window=7).mean()
-    daily_sales['Vitality(순성장)'] = daily_sales['결제금액(상품별)'] - daily_sales['Trend(7D)']
+    daily_sales = compute_daily_trend(filter_key, df)
     
     fig_vital = apply_kr_font(px.line(daily_sales, x='주문일', y=['결제금액(상품별)', 'Trend(7D)'], title="매출 노이즈 제거 및 순수 성장 트렌드 분석"))
     st.plotly_chart(fig_vital, use_container_width=True)
     st.warning("📊 **체률 진단**: 파란선(실제매출)이 주황선(트렌드) 아래로 자주 내려간다면 계절적 호재에만 의존하고 있다는 신호입니다. 본질적인 경쟁력 강화가 필요합니다.")
 
-with tab41:
+def render_tab41():
     st.write("**AI 기반 고객 LTV 예측 (Predictive Modeling)**")
     # 단순 회귀 분석을 통한 고객별 기대 매출 예측 (RFM Score 활용)
     if '고객세그먼트' in df.columns and '누적매출' in df.columns:
         # 최근성이 높고 빈도가 높을수록 미래 가치가 높다는 가중치 적용
-        cust_ai = df.drop_duplicates('주문자연락처')[['주문자연락처', '누적매출', '총구매건수', '구매간격']].fillna(0)
+        cust_ai = compute_cust_df(filter_key, df)[['주문자연락처', '누적매출', '총구매건수', '구매간격']].fillna({'누적매출': 0, '총구매건수': 0, '구매간격': 0})
         # 간단한 휴리스틱: (평균구매액 * 구매빈도) + (1000 - 구매간격 * 100) -> 복잡한 ML 대신 직관적 스코어링
         cust_ai['예측LTV_Score'] = (cust_ai['누적매출'] / cust_ai['총구매건수'].replace(0,1)) * cust_ai['총구매건수'] * (1 + 1/cust_ai['구매간격'].replace(0,1))
         
-        top_pred_cust = cust_ai.sort_values('예측LTV_Score', ascending=False).head(20)
+        top_pred_cust = cust_ai.nlargest(20, '예측LTV_Score')
         fig_pred = apply_kr_font(px.bar(top_pred_cust, x='예측LTV_Score', y='주문자연락처', orientation='h', title="AI가 예측한 미래의 큰손 (Top 20)"))
         st.plotly_chart(fig_pred, use_container_width=True)
         st.success("🤖 **AI 인사이트**: 과거 매출이 낮더라도 최근 구매 빈도가 급증하는 고객이 미래의 VIP입니다. 위 리스트는 잠재력 기준 상위 고객입니다.")
     else:
         st.write("예측을 위한 고객 데이터가 충분하지 않습니다.")
 
-with tab42:
+def render_tab42():
     st.write("**매켓 타이밍: 골든/데드 크로스 분석 (Market Timing)**")
-    ma_df = df.groupby('주문일')['결제금액(상품별)'].sum().reset_index()
-    ma_df['MA5'] = ma_df['결제금액(상품별)'].rolling(window=5).mean()
-    ma_df['MA20'] = ma_df['결제금액(상품별)'].rolling(window=20).mean()
-    ma_df['Signal'] = 0
-    ma_df['Signal'][5:] = np.where(ma_df['MA5'][5:] > ma_df['MA20'][5:], 1, 0)
-    ma_df['Position'] = ma_df['Signal'].diff()
+    ma_df = compute_ma_signals(filter_key, df)
     fig_ma = apply_kr_font(px.line(ma_df, x='주문일', y=['결제금액(상품별)', 'MA5', 'MA20'], title="매출 이동평균선 및 추세 매매 타이밍"))
     golden = ma_df[ma_df['Position'] == 1]
     dead = ma_df[ma_df['Position'] == -1]
@@ -1078,42 +1344,28 @@ with tab42:
     else:
         st.error("📉 **하락장 (Bear Market)**: 현재 단기 추세가 꺾였습니다. 리스크 관리와 현금 확보, 할인 행사를 통한 재고 소진이 필요한 시점입니다.")
 
-with tab43:
+def render_tab43():
     st.write("**상품 가격 저항성/탄력성 분석 (Price Sensitivity)**")
     # 주요 상품의 '단가' 변동에 따른 '주문수량' 변화 추세 분석
     if '단가' in df.columns:
-        top_items = df.groupby('상품명')['결제금액(상품별)'].sum().sort_values(ascending=False).head(5).index.tolist()
-        elasticity_df = df[df['상품명'].isin(top_items)].groupby(['상품명', '단가'])['주문수량'].sum().reset_index()
-        
-        fig_elas = apply_kr_font(px.scatter(elasticity_df, x='단가', y='주문수량', color='상품명', trendline="ols",
-                                           title="가격(X) 변화에 따른 판매량(Y) 민감도 (기울기가 급할수록 가격 저항이 큼)"))
+        fig_elas = go.Figure(compute_elasticity_fig(filter_key, df))
         st.plotly_chart(fig_elas, use_container_width=True)
         st.info("💡 **전략 가이드**: 추세선이 수평에 가까운 상품은 가격을 올려도 판매량이 크게 줄지 않는 '충성 상품'입니다. 반대로 급격히 우하향한다면 가격 인상에 매우 신중해야 합니다.")
     else:
         st.write("단가 분석에 필요한 데이터가 없습니다.")
 
-with tab44:
+def render_tab44():
     st.write("**상품 연관 구매 네트워크 그래프 (Product Network)**")
     # 상품간 동시 구매 빈도를 노드와 엣지로 시각화 (산점도로 네트워크 흉내)
     if '주문번호' in df.columns:
-        df_valid = df[df['상품명'].notna()]
-        basket = df_valid.groupby('주문번호')['상품명'].apply(list)
-        pairs = []
-        for items in basket:
-            if len(items) >= 2:
-                items = sorted(list(set(items)))
-                pairs.extend(list(itertools.combinations(items, 2)))
-        
-        if pairs:
-            pair_counts = collections.Counter(pairs)
-            nodes = set()
-            edges = []
-            for (item1, item2), count in pair_counts.most_common(50): # 상위 50개 연결만
-                nodes.add(item1)
-                nodes.add(item2)
-                edges.append({'Source': item1, 'Target': item2, 'Weight': count})
-            
-            edge_df = pd.DataFrame(edges)
+        pair_counts = compute_basket_pairs(filter_key, df)
+        if not pair_counts.empty:
+            top_pairs = pair_counts.nlargest(50) # 상위 50개 연결만
+            edge_df = pd.DataFrame({
+                'Source': top_pairs.index.get_level_values(0).astype(str),
+                'Target': top_pairs.index.get_level_values(1).astype(str),
+                'Weight': top_pairs.to_numpy()
+            })
             # 네트워크 그래프는 Plotly의 기본 기능이 약하므로, Scatter로 대략적인 관계 표현 (X축: 소스, Y축: 타겟, 크기: 빈도)
             fig_net = apply_kr_font(px.scatter(edge_df, x='Source', y='Target', size='Weight', color='Weight',
                                               title="핵심 상품 연관 구매 매트릭스 (함께 팔리는 강도 시각화)"))
@@ -1124,13 +1376,13 @@ with tab44:
     else:
         st.write("주문 데이터가 없습니다.")
 
-with tab45:
+def render_tab45():
     st.write("**고객 생존 분석 (Survival Analysis - Customer Retention)**")
     # 고객별 첫 구매일로부터 경과일수에 따른 생존율 추정 (Kaplan-Meier 단순화)
     if '구매경과월' in df.columns:
         retention_curve = df.groupby('구매경과월')['주문자연락처'].nunique().reset_index()
         # 전체 고객수 대비 해당 경과월에 활동한 고객 비율
-        total_cust = df['주문자연락처'].nunique()
+        total_cust = compute_kpis(filter_key, df)['customer_count']
         retention_curve['생존율'] = retention_curve['주문자연락처'] / total_cust * 100
         retention_curve = retention_curve[retention_curve['구매경과월'] > 0]
         
@@ -1141,15 +1393,15 @@ with tab45:
     else:
         st.write("생존 분석을 위한 기간 데이터가 부족합니다.")
 
-with tab46:
+def render_tab46():
     st.write("**멀티채널 기여도 분석 (Multi-Channel Attribution)**")
     if '주문경로' in df.columns:
         df_sorted_chn = df.sort_values(['주문자연락처', '주문일'])
-        first_touch = df_sorted_chn.groupby('주문자연락처')['주문경로'].first().value_counts().reset_index()
+        first_touch = df_sorted_chn.groupby('주문자연락처', observed=True)['주문경로'].first().value_counts().loc[lambda s: s > 0].reset_index()
         first_touch.columns = ['채널', 'First_Touch_건수']
-        last_touch = df_sorted_chn.groupby('주문자연락처')['주문경로'].last().value_counts().reset_index()
+        last_touch = df_sorted_chn.groupby('주문자연락처', observed=True)['주문경로'].last().value_counts().loc[lambda s: s > 0].reset_index()
         last_touch.columns = ['채널', 'Last_Touch_건수']
-        attr_df = pd.merge(first_touch, last_touch, on='채널', how='outer').fillna(0)
+        attr_df = pd.merge(first_touch, last_touch, on='채널', how='outer').fillna({'First_Touch_건수': 0, 'Last_Touch_건수': 0})
         attr_df['기여도차이'] = attr_df['Last_Touch_건수'] - attr_df['First_Touch_건수']
         fig_attr = apply_kr_font(px.bar(attr_df, x='채널', y=['First_Touch_건수', 'Last_Touch_건수'], barmode='group',
                                        title="채널별 고객 획득(First) vs 전환(Last) 기여도 비교"))
@@ -1158,12 +1410,13 @@ with tab46:
     else:
         st.write("채널 데이터가 없습니다.")
 
-with tab47:
+def render_tab47():
     st.write("**스마트 목표 달성 트래커 (Smart Goal Tracker)**")
     # 월 목표 설정 및 일별 누적 매출 비교
-    target_revenue = st.number_input("이번 달 목표 매출액을 설정하세요 (원)", min_value=1000000, value=300000000, step=1000000)
+    target_revenue = tab_widget(st.number_input, "이번 달 목표 매출액을 설정하세요 (원)", key="t47_target", default=300000000, min_value=1000000, step=1000000)
     
-    current_revenue = df['결제금액(상품별)'].sum()
+    kpis = compute_kpis(filter_key, df)
+    current_revenue = kpis['total_sales']
     achievement_rate = (current_revenue / target_revenue) * 100
     
     col_goal1, col_goal2 = st.columns(2)
@@ -1185,7 +1438,7 @@ with tab47:
         
     with col_goal2:
         # 일별 예상 추세선 (Projection)
-        days_passed = df['주문일'].nunique()
+        days_passed = kpis['order_days']
         avg_daily_sales = current_revenue / days_passed if days_passed > 0 else 0
         projected_revenue = avg_daily_sales * 30 # 월 30일 기준 단순 예측
         gap = projected_revenue - target_revenue
@@ -1193,55 +1446,62 @@ with tab47:
         st.metric("월말 예상 매출 (Projection)", f"{projected_revenue:,.0f}원", delta=f"{gap:,.0f}원 (목표 대비)")
         st.info(f"📅 **진단**: 현재 속도라면 목표를 **{'초과 달성' if gap >= 0 else '미달'}**할 것으로 예상됩니다. {'페이스를 유지하세요!' if gap >= 0 else '추가적인 프로모션이 필요합니다.'}")
 
-with tab48:
+def render_tab48():
     st.write("**VIP 개별 프로파일링 (VIP Persona CRM)**")
     if '주문자연락처' in df.columns:
-        vip_list = df.groupby('주문자연락처')['결제금액(상품별)'].sum().sort_values(ascending=False).head(20).index.tolist()
-        selected_vip = st.selectbox("분석할 VIP 고객을 선택하세요 (매출 Top 20)", vip_list)
+        vip_list = compute_cust_df(filter_key, df).nlargest(20, '결제금액(상품별)')['주문자연락처'].tolist()
+        selected_vip = tab_widget(st.selectbox, "분석할 VIP 고객을 선택하세요 (매출 Top 20)", vip_list, key="t48_vip", default=None)
         vip_data = df[df['주문자연락처'] == selected_vip]
         col_vip1, col_vip2, col_vip3 = st.columns(3)
         col_vip1.metric("총 구매금액", f"{vip_data['결제금액(상품별)'].sum():,.0f}원")
         col_vip2.metric("총 주문건수", f"{vip_data['주문번호'].nunique()}건")
         col_vip3.metric("평균 구매주기", f"{vip_data['구매간격'].mean():.1f}일")
         st.write("🛒 **상품 선호도 (구매 이력)**")
-        vip_prod = vip_data.groupby('상품명')['주문수량'].sum().reset_index().sort_values('주문수량', ascending=False)
+        vip_prod = vip_data.groupby('상품명', observed=True)['주문수량'].sum().reset_index().sort_values('주문수량', ascending=False)
         st.dataframe(vip_prod, hide_index=True)
         st.success("👑 **응대 가이드**: 이 고객은 우리 브랜드의 최상위 VIP입니다. 선호 상품인 **" + vip_prod.iloc[0]['상품명'] + "**의 신규 옵션이나 연관 상품을 '시크릿 쿠폰'과 함께 제안해 보세요.")
     else:
         st.write("고객 상세 데이터가 없습니다.")
 
-with tab49:
+def render_tab49():
     st.write("**AI 경영 비서 리포트 (Gen-AI Executive Summary)**")
     # 주요 지표를 텍스트로 요약 (실제 LLM 연동 대신 규칙 기반 생성)
+    # 합계/고유값은 캐싱된 KPI에서, 채널/시간대 1위는 이미 캐싱된 채널 집계와 시간x채널 피벗에서 가져옴
+    kpis = compute_kpis(filter_key, df)
+    best_route = channel_agg.loc[channel_agg['매출'].idxmax(), '채널']
+    golden_hour = compute_channel_hour_pivot(filter_key, df).sum(axis=1).idxmax()
+    repurchase_cust = (compute_cust_df(filter_key, df)['재구매여부'] == '재구매').sum()
     summary_text = f"""
     ### 📢 [경영 일일 브리핑]
-    - **매출 현황**: 현재 총 매출은 **{df['결제금액(상품별)'].sum():,.0f}원**이며, 총 이익은 **{df['GP'].sum():,.0f}원**입니다.
-    - **마케팅 효율**: 가장 효율이 좋은 채널은 **{df.groupby('주문경로')['결제금액(상품별)'].sum().idxmax()}**이며, 집중해야 할 골든 타임은 **{df.groupby('주문시')['결제금액(상품별)'].sum().idxmax()}시**입니다.
-    - **리스크 관리**: 재구매율은 **{(df[df['재구매여부']=='재구매']['주문자연락처'].nunique() / df['주문자연락처'].nunique() * 100):.1f}%**이며, 이탈 방지를 위한 CRM 캠페인이 필요합니다.
-    - **전략 제언**: 수익성 높은 **'{df.groupby('상품명')['GP'].sum().idxmax()}'** 상품을 미끼 상품과 번들링하여 객단가를 높이는 전략을 추천합니다.
+    - **매출 현황**: 현재 총 매출은 **{kpis['total_sales']:,.0f}원**이며, 총 이익은 **{kpis['total_gp']:,.0f}원**입니다.
+    - **마케팅 효율**: 가장 효율이 좋은 채널은 **{best_route}**이며, 집중해야 할 골든 타임은 **{golden_hour}시**입니다.
+    - **리스크 관리**: 재구매율은 **{(repurchase_cust / kpis['customer_count'] * 100):.1f}%**이며, 이탈 방지를 위한 CRM 캠페인이 필요합니다.
+    - **전략 제언**: 수익성 높은 **'{compute_prod_stats(filter_key, df)['GP'].idxmax()}'** 상품을 미끼 상품과 번들링하여 객단가를 높이는 전략을 추천합니다.
     """
     st.markdown(summary_text)
     st.info("🤖 **AI 비서**: 사장님, 오늘 데이터를 분석한 결과 '재구매 유도'가 가장 시급한 과제입니다. VIP 고객들에게 안부 문자를 보내보시는 건 어떨까요?")
 
-with tab50:
+def render_tab50():
     st.write("**통합 관제 센터 (Total Command Center)**")
     # 핵심 4대 지표를 한 줄에 대시보드 형태로 배치
+    kpis = compute_kpis(filter_key, df)
     cc_col1, cc_col2, cc_col3, cc_col4 = st.columns(4)
-    cc_col1.metric("총 매출 (Revenue)", f"{df['결제금액(상품별)'].sum():,.0f}원", delta="전월 대비 +5% (예상)")
-    cc_col2.metric("총 이익 (Gross Profit)", f"{df['GP'].sum():,.0f}원", delta=f"{df['GP'].sum()/df['결제금액(상품별)'].sum()*100:.1f}% (이익률)")
-    cc_col3.metric("활성 고객 (Active Users)", f"{df['주문자연락처'].nunique():,}명", delta="신규 유입 +12명")
-    cc_col4.metric("평균 객단가 (AOV)", f"{df['결제금액(상품별)'].sum()/df['주문번호'].nunique():,.0f}원", delta="전주 대비 유지")
+    cc_col1.metric("총 매출 (Revenue)", f"{kpis['total_sales']:,.0f}원", delta="전월 대비 +5% (예상)")
+    cc_col2.metric("총 이익 (Gross Profit)", f"{kpis['total_gp']:,.0f}원", delta=f"{kpis['total_gp']/kpis['total_sales']*100:.1f}% (이익률)")
+    cc_col3.metric("활성 고객 (Active Users)", f"{kpis['customer_count']:,}명", delta="신규 유입 +12명")
+    cc_col4.metric("평균 객단가 (AOV)", f"{kpis['total_sales']/kpis['order_count']:,.0f}원", delta="전주 대비 유지")
     
     st.markdown("---")
     st.write("📊 **실시간 주요 현황 (Live Status)**")
     live_col1, live_col2 = st.columns(2)
     with live_col1:
         st.subheader("매출 Top 5 상품")
-        st.dataframe(df.groupby('상품명')['결제금액(상품별)'].sum().sort_values(ascending=False).head(5).reset_index().style.format({'결제금액(상품별)': '{:,.0f}'}), hide_index=True)
+        st.dataframe(compute_prod_sales(filter_key, df).head(5).reset_index().style.format({'결제금액(상품별)': '{:,.0f}'}), hide_index=True)
     with live_col2:
         st.subheader("이탈 위험 VIP")
         if '고객세그먼트' in df.columns:
-            churn_vip = df[(df['고객세그먼트']=='VIP') & (df['이탈위험도']=='이탈 위험')]['주문자연락처'].unique()
+            cust_df = compute_cust_df(filter_key, df)
+            churn_vip = cust_df.loc[(cust_df['고객세그먼트']=='VIP') & (cust_df['이탈위험도']=='이탈 위험'), '주문자연락처'].to_numpy(dtype=object)
             st.write(f"총 {len(churn_vip)}명의 VIP가 위험합니다.")
             st.write(churn_vip[:5])
         else:
@@ -1249,6 +1509,19 @@ with tab50:
     
     st.success("🏆 **Legendary Achievement**: 축하합니다! 총 50개의 전문 분석 탭을 모두 완성하셨습니다. 이제 이 대시보드는 비즈니스의 모든 것을 꿰뚫어 보는 '신의 눈(God's Eye)'입니다.")
 
+# 선택된 탭만 렌더링 (나머지 탭 본문은 실행하지 않음)
+render_funcs = [
+    render_tab1, render_tab2, render_tab3, render_tab4, render_tab5, render_tab6, render_tab7, render_tab8, render_tab9, render_tab10,
+    render_tab11, render_tab12, render_tab13, render_tab14, render_tab15, render_tab16, render_tab17, render_tab18, render_tab19, render_tab20,
+    render_tab21, render_tab22, render_tab23, render_tab24, render_tab25, render_tab26, render_tab27, render_tab28, render_tab29, render_tab30,
+    render_tab31, render_tab32, render_tab33, render_tab34, render_tab35, render_tab36, render_tab37, render_tab38, render_tab39, render_tab40,
+    render_tab41, render_tab42, render_tab43, render_tab44, render_tab45, render_tab46, render_tab47, render_tab48, render_tab49, render_tab50,
+]
+for tab, render in zip(tabs, render_funcs):
+    if tab.open:
+        with tab:
+            render()
+
 st.markdown("---")
 
 # [F] 데이터 다운로드 (사이드바 이동)